@@ -0,0 +1,126 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.auth.auth0 import get_current_user
+from app.core.auth.base import require_permissions
+from app.core.config import settings
+from app.core.memory import MemoryTracingError, object_counts, rss_bytes, tracer
+from app.core.profiler import ProfilerBusy, profiler
+
+router = APIRouter()
+
+def require_admin(user: dict = Depends(get_current_user)) -> dict:
+    """
+    Require the ADMIN_PERMISSIONS, read per request so that importing the
+    router does not build the settings
+    """
+    return require_permissions(settings.ADMIN_PERMISSIONS)(user)
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="At most PROFILER_MAX_SECONDS"),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    triggered: bool = Query(
+        False, description="Only sample requests sent with the PROFILER_TRIGGER_HEADER header"
+    ),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Profile the worker serving this request for the given number of
+    seconds and return collapsed stacks, ready for flamegraph.pl or
+    speedscope. Each worker profiles only itself.
+    """
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS}"
+        )
+    try:
+        stacks = await run_in_threadpool(profiler.run, seconds, interval_ms / 1000, triggered)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return PlainTextResponse(stacks)
+
+@router.post("/memory/tracing")
+async def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=100, description="Traceback depth kept per allocation"),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Start tracing allocations in this worker. Tracing slows the worker
+    down; stop it once done.
+    """
+    tracer.start(frames)
+    return {"tracing": True, "rss_bytes": rss_bytes()}
+
+@router.delete("/memory/tracing")
+async def stop_memory_tracing(
+    admin: dict = Depends(require_admin)
+):
+    """
+    Stop tracing allocations and drop the saved snapshots
+    """
+    tracer.stop()
+    return {"tracing": False, "rss_bytes": rss_bytes()}
+
+@router.get("/memory/top")
+async def top_allocations(
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Get the allocation sites holding the most traced memory
+    """
+    try:
+        sites = await run_in_threadpool(tracer.top, limit, group_by)
+    except MemoryTracingError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"rss_bytes": rss_bytes(), "sites": sites}
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED)
+async def save_memory_snapshot(
+    admin: dict = Depends(require_admin)
+):
+    """
+    Save a snapshot of traced allocations to diff against later
+    """
+    try:
+        snapshot_id = await run_in_threadpool(tracer.save_snapshot)
+    except MemoryTracingError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"id": snapshot_id, "saved": tracer.snapshot_ids(), "rss_bytes": rss_bytes()}
+
+@router.get("/memory/snapshots/{snapshot_id}/diff")
+async def diff_memory_snapshot(
+    snapshot_id: int,
+    until: Optional[int] = Query(None, description="Later snapshot to compare to; default now"),
+    limit: int = Query(20, ge=1, le=500),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Get the allocation sites that grew most since a saved snapshot
+    """
+    try:
+        sites = await run_in_threadpool(tracer.diff, snapshot_id, until, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot {e} not found")
+    except MemoryTracingError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"rss_bytes": rss_bytes(), "sites": sites}
+
+@router.get("/memory/objects")
+async def memory_objects(
+    limit: int = Query(50, ge=1, le=500),
+    admin: dict = Depends(require_admin)
+):
+    """
+    Count live instances of the app's own classes (models, schemas and
+    the like); works without tracing
+    """
+    counts = await run_in_threadpool(object_counts, "app.", limit)
+    return {"rss_bytes": rss_bytes(), "objects": counts}
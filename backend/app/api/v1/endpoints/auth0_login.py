@@ -2,19 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-import httpx
 from typing import Dict, Optional, Any
 from urllib.parse import urlencode
 from pydantic import BaseModel
 
 from app.core.database import get_db
-from app.core.auth.auth0 import auth0_handler, get_current_active_user
+from app.core.auth.auth0 import get_auth0_handler, get_current_active_user
 from app.core.config import settings
 from app.repositories.user import UserRepository
-from app.schemas.auth import (
-    Auth0Token, LoginRequest, SignupRequest, Auth0Error, Auth0User,
-    SocialCallbackRequest
-)
+from app.schemas.auth import Auth0Token, LoginRequest, SignupRequest, Auth0Error, Auth0User
 from app.core.schemas.error import AuthenticationError
 
 router = APIRouter()
@@ -25,6 +21,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)) -> Any:
     """
     Login with Auth0 using password grant
     """
+    auth0_handler = get_auth0_handler()
     try:
         url = f"https://{auth0_handler.domain}/oauth/token"
         payload = {
@@ -37,11 +34,10 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)) -> Any:
             "scope": "openid profile email"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload)
-            if response.status_code != 200:
-                raise AuthenticationError("Invalid credentials")
-            return response.json()
+        response = await auth0_handler.post("password_grant", url, json=payload)
+        if response.status_code != 200:
+            raise AuthenticationError("Invalid credentials")
+        return response.json()
     except Exception as e:
         raise AuthenticationError(str(e))
 
@@ -50,6 +46,7 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)) -> Any:
     """
     Sign up with Auth0
     """
+    auth0_handler = get_auth0_handler()
     try:
         # Create user in Auth0
         user_data = {
@@ -75,11 +72,10 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)) -> Any:
             "scope": "openid profile email"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload)
-            if response.status_code != 200:
-                raise AuthenticationError("Failed to get token for new user")
-            return response.json()
+        response = await auth0_handler.post("password_grant", url, json=payload)
+        if response.status_code != 200:
+            raise AuthenticationError("Failed to get token for new user")
+        return response.json()
     except Exception as e:
         raise AuthenticationError(str(e))
 
@@ -95,6 +91,7 @@ async def login_redirect(request: Request) -> Any:
     """
     Redirect to Auth0 login page
     """
+    auth0_handler = get_auth0_handler()
     redirect_uri = str(request.url_for("auth0_callback"))
     return await auth0_handler.authorize_redirect(request, redirect_uri)
 
@@ -103,6 +100,7 @@ async def auth0_callback(request: Request) -> Any:
     """
     Handle Auth0 callback
     """
+    auth0_handler = get_auth0_handler()
     try:
         token = await auth0_handler.authorize_access_token(request)
         user = await auth0_handler.parse_id_token(request, token)
@@ -119,6 +117,7 @@ async def logout(request: Request) -> Any:
     """
     Logout from Auth0
     """
+    auth0_handler = get_auth0_handler()
     request.session.clear()
     return RedirectResponse(
         url=f"https://{auth0_handler.domain}/v2/logout?"
@@ -131,6 +130,7 @@ async def refresh_token(request: Request) -> Any:
     """
     Refresh Auth0 access token
     """
+    auth0_handler = get_auth0_handler()
     try:
         refresh_token = request.json().get("refresh_token")
         if not refresh_token:
@@ -147,11 +147,10 @@ async def refresh_token(request: Request) -> Any:
             "refresh_token": refresh_token
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload)
-            if response.status_code != 200:
-                raise AuthenticationError("Failed to refresh token")
-            return response.json()
+        response = await auth0_handler.post("refresh_token", url, json=payload)
+        if response.status_code != 200:
+            raise AuthenticationError("Failed to refresh token")
+        return response.json()
     except Exception as e:
         raise AuthenticationError(str(e))
 
@@ -160,6 +159,7 @@ async def social_callback(request: Request) -> Any:
     """
     Handle social login callback
     """
+    auth0_handler = get_auth0_handler()
     try:
         token = await auth0_handler.authorize_access_token(request)
         user = await auth0_handler.parse_id_token(request, token)
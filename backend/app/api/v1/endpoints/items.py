@@ -1,70 +1,400 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from datetime import datetime, timedelta
+from typing import FrozenSet, List, Optional
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.auth.auth0 import get_current_active_user
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.events import EventBroker, Subscription, format_sse, get_broker, item_channel
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.query_monitor import query_budget
+from app.core.serialization import field_selection, json_response, partial_model
+from app.jobs.repricing import run_repricing_job_in_background
 from app.repositories.item import ItemRepository
-from app.schemas.item import Item, ItemCreate, ItemUpdate
-from app.schemas.error import NotFoundError
+from app.repositories.repricing_job import RepricingJobRepository
+from app.repositories.user import UserRepository
+from app.schemas.item import (
+    Item, ItemCreate, ItemUpdate, ItemQuery, ItemAggregate, ItemBatch, ItemBatchRequest, ItemChange,
+    ItemChangeFeed, ItemSearchPage
+)
+from app.schemas.repricing import RepricingJob, RepricingRule
 
 router = APIRouter()
 item_repository = ItemRepository()
+user_repository = UserRepository()
+repricing_job_repository = RepricingJobRepository()
 
 @router.get("/", response_model=List[Item])
+@query_budget(2)
 async def read_items(
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    filters: ItemQuery = Depends(),
+    fields: Optional[FrozenSet[str]] = Depends(field_selection(Item)),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Get all items for the current user
+    Get the current user's items, optionally filtered and sorted, with
+    only the requested fields
     """
-    items = item_repository.get_by_owner(db, current_user["sub"], skip, limit)
-    return items
+    count, latest = item_repository.get_owner_version(db, current_user["sub"])
+    etag = make_etag(
+        "items", current_user["sub"], count, latest, skip, limit, filters.model_dump_json(),
+        ",".join(sorted(fields or ()))
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    try:
+        items = item_repository.read_filtered_by_owner(
+            db, current_user["sub"], filters, skip, limit, fields
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    return json_response(List[partial_model(Item, fields)], items, headers={"ETag": etag})
+
+@router.get("/aggregates", response_model=ItemAggregate)
+@query_budget(1)
+async def read_item_aggregates(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get item count and price/tax totals for the current user
+    """
+    count, price, tax = item_repository.summaries.get_for_owner(db, current_user["sub"])
+    return ItemAggregate(
+        scope=current_user["sub"], item_count=count, price_total=price, tax_total=tax
+    )
+
+@router.get("/aggregates/company", response_model=ItemAggregate)
+@query_budget(2)
+async def read_company_item_aggregates(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get item count and price/tax totals across the current user's company
+    """
+    user = user_repository.get_by_auth0_id(db, current_user["sub"])
+    if not user or not user.company:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Current user has no company"
+        )
+    count, price, tax = item_repository.summaries.get_for_company(db, user.company)
+    return ItemAggregate(
+        scope=user.company, item_count=count, price_total=price, tax_total=tax
+    )
+
+@router.post("/reprice", response_model=RepricingJob, status_code=status.HTTP_202_ACCEPTED)
+async def reprice_items(
+    rule: RepricingRule,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Start a bulk price change over the current user's matching items
+    """
+    total = item_repository.count_for_repricing(db, current_user["sub"], rule)
+    job = repricing_job_repository.create_for_owner(db, current_user["sub"], rule, total)
+    background_tasks.add_task(run_repricing_job_in_background, job.id)
+    return job
+
+@router.get("/reprice/{job_id}", response_model=RepricingJob)
+async def read_repricing_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get the progress of a repricing job
+    """
+    job = repricing_job_repository.get_owned(db, job_id, current_user["sub"])
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Repricing job {job_id} not found"
+        )
+    return job
+
+@router.post("/reprice/{job_id}/resume", response_model=RepricingJob, status_code=status.HTTP_202_ACCEPTED)
+async def resume_repricing_job(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Resume a failed repricing job, or one whose worker died, from its last
+    completed chunk
+    """
+    job = repricing_job_repository.get_owned(db, job_id, current_user["sub"])
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Repricing job {job_id} not found"
+        )
+    if not repricing_job_repository.is_resumable(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Repricing job is {job.status}"
+        )
+    background_tasks.add_task(run_repricing_job_in_background, job.id)
+    return job
+
+@router.get("/search", response_model=ItemSearchPage)
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Search the current user's items by name and description
+    """
+    after = decode_cursor(cursor, 2)
+    hits = item_repository.search(db, current_user["sub"], q, after, limit + 1)
+    page = hits[:limit]
+    next_cursor = None
+    if len(hits) > limit:
+        last_item, last_score = page[-1]
+        next_cursor = encode_cursor(last_score, last_item.id)
+    return json_response(
+        ItemSearchPage,
+        ItemSearchPage(items=[item for item, _ in page], next_cursor=next_cursor),
+        trusted=True
+    )
+
+def _read_batch(
+    db: Session, owner_id: str, ids: List[str], fields: Optional[FrozenSet[str]]
+) -> Response:
+    # Deduplicate while keeping the caller's order
+    ids = list(dict.fromkeys(ids))
+    found = {
+        item.id: item for item in item_repository.read_many_by_owner(db, owner_id, ids, fields)
+    }
+    batch_model = ItemBatch
+    if fields is not None:
+        batch_model = partial_model(
+            ItemBatch, None, (("items", List[partial_model(Item, fields)]),)
+        )
+    batch = batch_model(
+        items=[found[item_id] for item_id in ids if item_id in found],
+        missing=[item_id for item_id in ids if item_id not in found]
+    )
+    return json_response(batch_model, batch, trusted=True)
+
+@router.get("/batch", response_model=ItemBatch)
+@query_budget(1)
+async def read_items_batch(
+    ids: List[str] = Query(..., min_length=1, max_length=100, description="IDs of the items to fetch"),
+    fields: Optional[FrozenSet[str]] = Depends(field_selection(Item)),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get several items by ID in one request
+    """
+    return _read_batch(db, current_user["sub"], ids, fields)
+
+@router.post("/batch", response_model=ItemBatch)
+@query_budget(1)
+async def read_items_batch_post(
+    batch: ItemBatchRequest,
+    fields: Optional[FrozenSet[str]] = Depends(field_selection(Item)),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get several items by ID, for ID lists too long for a query string
+    """
+    return _read_batch(db, current_user["sub"], batch.ids, fields)
+
+def _cursor_expired(since_updated_at: Optional[datetime]) -> bool:
+    # Tombstones older than this may already be archived away
+    horizon = datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    return since_updated_at is not None and since_updated_at < horizon
+
+@router.get("/changes", response_model=ItemChangeFeed)
+async def read_item_changes(
+    since: Optional[str] = Query(None, description="Cursor returned by the previous poll"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get items created, updated or deleted since the cursor
+    """
+    position = decode_cursor(since, 2)
+    since_updated_at, since_id = position if position else (None, None)
+    if _cursor_expired(since_updated_at):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Cursor has expired; reload the full item list"
+        )
+    items = item_repository.get_changes(
+        db, current_user["sub"], since_updated_at, since_id, limit + 1
+    )
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = encode_cursor(items[-1].updated_at, items[-1].id) if items else since
+    feed = ItemChangeFeed(
+        changes=[ItemChange.from_item(item) for item in items],
+        next_cursor=next_cursor,
+        has_more=has_more
+    )
+    return json_response(ItemChangeFeed, feed, trusted=True)
+
+@router.get("/stream")
+async def stream_item_changes(
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Stream the current user's item changes as server-sent events
+    """
+    position = decode_cursor(last_event_id, 2)
+    broker = get_broker()
+    # Subscribe before replaying so nothing committed in between is missed
+    subscription = broker.subscribe(item_channel(current_user["sub"]))
+    streaming = False
+    try:
+        backlog = []
+        if position and _cursor_expired(position[0]):
+            backlog.append(format_sse({"type": "resync"}))
+        elif position:
+            items = item_repository.get_changes(db, current_user["sub"], *position, limit=500)
+            for item in items:
+                message = item_repository.change_event(item, _replayed_event_type(item))
+                backlog.append(format_sse(message, message["cursor"]))
+            if len(items) == 500:
+                backlog.append(format_sse({"type": "resync"}))
+        response = StreamingResponse(
+            _event_stream(request, broker, subscription, backlog),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+        streaming = True
+        return response
+    finally:
+        # Until the stream takes it over, the subscription is ours to drop
+        if not streaming:
+            broker.unsubscribe(subscription)
+
+def _replayed_event_type(item) -> str:
+    if item.deleted_at:
+        return "item.deleted"
+    # Items are created with equal timestamps; any change moves updated_at
+    if item.created_at == item.updated_at:
+        return "item.created"
+    return "item.updated"
+
+async def _event_stream(
+    request: Request, broker: EventBroker, subscription: Subscription, backlog: List[str]
+):
+    """
+    Send the replayed backlog, then live events, until the client goes away
+    """
+    try:
+        for frame in backlog:
+            yield frame
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(
+                    subscription.get(), settings.EVENT_STREAM_KEEPALIVE_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(message, message.get("cursor"))
+    finally:
+        broker.unsubscribe(subscription)
 
 @router.post("/", response_model=Item, status_code=status.HTTP_201_CREATED)
+@query_budget(13)
 async def create_item(
     item: ItemCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
     Create a new item for the current user
     """
-    return item_repository.create_with_owner(db, item, current_user["sub"])
+    db_item = item_repository.create_with_owner(db, item, current_user["sub"])
+    response.headers["ETag"] = make_etag(db_item.id, db_item.updated_at)
+    return db_item
 
 @router.get("/{item_id}", response_model=Item)
+@query_budget(2)
 async def read_item(
     item_id: str,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
     Get a specific item by ID
     """
-    item = item_repository.get(db, item_id)
-    if not item or item.owner_id != current_user["sub"]:
-        raise NotFoundError(f"Item {item_id} not found")
-    return item
+    if if_none_match:
+        # Revalidate against the version column alone before loading the row
+        version = item_repository.get_version(db, item_id, current_user["sub"])
+        etag = make_etag(item_id, version) if version else None
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    item = item_repository.read_owned(db, item_id, current_user["sub"])
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item {item_id} not found"
+        )
+    return json_response(Item, item, headers={"ETag": make_etag(item.id, item.updated_at)})
 
 @router.put("/{item_id}", response_model=Item)
+@query_budget(8)
 async def update_item(
     item_id: str,
     item: ItemUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
-    Update a specific item
+    Update a specific item, optionally only if it still matches If-Match
     """
-    db_item = item_repository.get(db, item_id)
-    if not db_item or db_item.owner_id != current_user["sub"]:
-        raise NotFoundError(f"Item {item_id} not found")
-    return item_repository.update(db, item_id, item)
+    db_item = item_repository.get_owned(db, item_id, current_user["sub"])
+    if not db_item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item {item_id} not found"
+        )
+    # The ETag names a version whatever the encoding, so it is compared
+    # weakly; a strong comparison would fail everyone sent it compressed
+    current = make_etag(db_item.id, db_item.updated_at)
+    if if_match and not etag_matches(if_match, current):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Item has been modified since it was fetched"
+        )
+    db_item = item_repository.update_instance(db, db_item, item)
+    response.headers["ETag"] = make_etag(db_item.id, db_item.updated_at)
+    return db_item
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(7)
 async def delete_item(
     item_id: str,
     db: Session = Depends(get_db),
@@ -73,7 +403,11 @@ async def delete_item(
     """
     Delete a specific item
     """
-    db_item = item_repository.get(db, item_id)
-    if not db_item or db_item.owner_id != current_user["sub"]:
-        raise NotFoundError(f"Item {item_id} not found")
-    item_repository.delete(db, item_id) 
\ No newline at end of file
+    db_item = item_repository.get_owned(db, item_id, current_user["sub"])
+    if not db_item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item {item_id} not found"
+        )
+    # Soft delete so the change feed can hand out a tombstone
+    item_repository.soft_delete_instance(db, db_item) 
\ No newline at end of file
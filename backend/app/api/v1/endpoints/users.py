@@ -1,30 +1,49 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
+from typing import FrozenSet, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.auth.auth0 import get_current_active_user
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.query_monitor import query_budget
+from app.core.serialization import field_selection, json_response, partial_model
+from app.repositories.item import ItemRepository
 from app.repositories.user import UserRepository
 from app.schemas.user import User, UserUpdate
-from app.schemas.error import NotFoundError
 
 router = APIRouter()
 user_repository = UserRepository()
+item_repository = ItemRepository()
 
 @router.get("/me", response_model=User)
+@query_budget(5)
 async def read_user_me(
+    fields: Optional[FrozenSet[str]] = Depends(field_selection(User)),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
     current_user: dict = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Get current user
     """
-    user = user_repository.get_by_auth0_id(db, current_user["sub"])
-    if not user:
+    # The profile embeds the user's items, so their version is part of the ETag
+    field_key = ",".join(sorted(fields or ()))
+    item_count, items_version = item_repository.get_owner_version(db, current_user["sub"])
+    user_version = user_repository.get_version(db, current_user["sub"])
+    if user_version:
+        etag = make_etag(
+            "user", current_user["sub"], user_version, item_count, items_version, field_key
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        user = user_repository.read_by_auth0_id(db, current_user["sub"], fields)
+    else:
         user = user_repository.create_from_auth0(db, current_user)
-    return user
+        etag = make_etag("user", user.id, user.updated_at, item_count, items_version, field_key)
+    return json_response(partial_model(User, fields), user, headers={"ETag": etag})
 
 @router.put("/me", response_model=User)
+@query_budget(4)
 async def update_user_me(
     user_update: UserUpdate,
     current_user: dict = Depends(get_current_active_user),
@@ -36,18 +55,23 @@ async def update_user_me(
     user = user_repository.get_by_auth0_id(db, current_user["sub"])
     if not user:
         user = user_repository.create_from_auth0(db, current_user)
-    return user_repository.update(db, user.id, user_update)
+    return user_repository.update_instance(db, user, user_update)
 
 @router.get("/{user_id}", response_model=User)
+@query_budget(2)
 async def read_user(
     user_id: str,
+    fields: Optional[FrozenSet[str]] = Depends(field_selection(User)),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
     Get a specific user by ID
     """
-    user = user_repository.get(db, user_id)
+    user = user_repository.read_by_auth0_id(db, user_id, fields)
     if not user:
-        raise NotFoundError(f"User {user_id} not found")
-    return user 
\ No newline at end of file
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User {user_id} not found"
+        )
+    return json_response(partial_model(User, fields), user) 
\ No newline at end of file
@@ -1,3 +1,6 @@
+import asyncio
+import time
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -6,11 +9,22 @@ from jwt import PyJWTError
 import httpx
 from urllib.parse import urlencode
 
+from app.core import timing
 from app.core.config import settings
-from app.core.schemas.error import AuthenticationError, AuthorizationError
+from app.core.metrics import auth0_errors, jwks_cache, jwt_verify_duration, track_upstream
 
 security = HTTPBearer()
 
+def authentication_error(detail: str) -> HTTPException:
+    """
+    401 for a missing or invalid token
+    """
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
 class Auth0Handler:
     """
     Auth0 authentication handler
@@ -21,43 +35,52 @@ class Auth0Handler:
         self.client_secret = settings.AUTH0_CLIENT_SECRET
         self.audience = settings.AUTH0_AUDIENCE
         self.algorithms = settings.AUTH0_ALGORITHMS
+        self.jwks_url = f"https://{self.domain}/.well-known/jwks.json"
+        self._jwks: Optional[list] = None
+        self._jwks_fetched_at = 0.0
+        self._jwks_lock = asyncio.Lock()
 
     def get_token_auth_header(self, credentials: HTTPAuthorizationCredentials) -> str:
         """
         Get the token from the Authorization header
         """
         if not credentials:
-            raise AuthenticationError("No authorization header")
+            raise authentication_error("No authorization header")
         
         parts = credentials.credentials.split()
         if parts[0].lower() != "bearer":
-            raise AuthenticationError("Authorization header must start with Bearer")
+            raise authentication_error("Authorization header must start with Bearer")
         elif len(parts) == 1:
-            raise AuthenticationError("Token not found")
+            raise authentication_error("Token not found")
         elif len(parts) > 2:
-            raise AuthenticationError("Authorization header must be Bearer token")
+            raise authentication_error("Authorization header must be Bearer token")
         
         return parts[1]
 
-    def verify_token(self, token: str) -> Dict[str, Any]:
+    async def verify_token(self, token: str) -> Dict[str, Any]:
         """
         Verify the JWT token
         """
+        started = time.perf_counter()
+        result = "invalid"
+        try:
+            payload = await self._verify_token(token)
+            result = "valid"
+            return payload
+        finally:
+            elapsed = time.perf_counter() - started
+            jwt_verify_duration.observe(elapsed, result)
+            timing.record("auth", elapsed)
+
+    async def _verify_token(self, token: str) -> Dict[str, Any]:
         try:
-            jwks_url = f"https://{self.domain}/.well-known/jwks.json"
             unverified_header = jwt.get_unverified_header(token)
-            rsa_key = {}
-            
-            for key in self.get_jwks(jwks_url):
-                if key["kid"] == unverified_header["kid"]:
-                    rsa_key = {
-                        "kty": key["kty"],
-                        "kid": key["kid"],
-                        "use": key["use"],
-                        "n": key["n"],
-                        "e": key["e"]
-                    }
-                    break
+            rsa_key = self._find_key(await self.get_jwks(), unverified_header["kid"])
+            if not rsa_key:
+                # The signing key may have been rotated since the cached fetch
+                rsa_key = self._find_key(
+                    await self.get_jwks(refresh=True), unverified_header["kid"]
+                )
 
             if rsa_key:
                 payload = jwt.decode(
@@ -69,17 +92,50 @@ class Auth0Handler:
                 )
                 return payload
             
-            raise AuthenticationError("Unable to find appropriate key")
+            raise authentication_error("Unable to find appropriate key")
             
         except PyJWTError as e:
-            raise AuthenticationError(str(e))
+            raise authentication_error(str(e)) from e
+
+    def _find_key(self, keys: list, kid: str) -> Optional[jwt.PyJWK]:
+        for key in keys:
+            if key["kid"] == kid:
+                return jwt.PyJWK(key)
+        return None
+
+    async def get_jwks(self, refresh: bool = False) -> list:
+        """
+        Get JWKS from Auth0, cached for JWKS_CACHE_SECONDS. A refresh is
+        honoured at most once per JWKS_MIN_REFRESH_SECONDS, so tokens with
+        unknown key IDs cannot make us hammer Auth0. Requests that miss
+        together wait for a single fetch, without blocking the event loop.
+        """
+        async with self._jwks_lock:
+            age = time.monotonic() - self._jwks_fetched_at
+            stale = self._jwks is None or age > settings.JWKS_CACHE_SECONDS
+            if stale or (refresh and age > settings.JWKS_MIN_REFRESH_SECONDS):
+                jwks_cache.inc("miss")
+                with track_upstream("jwks"):
+                    async with httpx.AsyncClient() as client:
+                        response = await client.get(self.jwks_url)
+                    response.raise_for_status()
+                self._jwks = response.json()["keys"]
+                self._jwks_fetched_at = time.monotonic()
+            else:
+                jwks_cache.inc("hit")
+            return self._jwks
 
-    def get_jwks(self, jwks_url: str) -> list:
+    async def post(self, operation: str, url: str, **kwargs) -> httpx.Response:
         """
-        Get JWKS from Auth0
+        POST to Auth0, recording the call's latency under the operation name
+        and counting transport errors and 5xx responses as failures
         """
-        response = httpx.get(jwks_url)
-        return response.json()["keys"]
+        with track_upstream(operation):
+            async with httpx.AsyncClient() as client:
+                response = await client.post(url, **kwargs)
+        if response.status_code >= 500:
+            auth0_errors.inc(operation)
+        return response
 
     async def create_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -92,14 +148,13 @@ class Auth0Handler:
         url = f"https://{self.domain}/api/v2/users"
         headers = {"Authorization": f"Bearer {token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=user_data, headers=headers)
-            if response.status_code != 201:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=response.json()
-                )
-            return response.json()
+        response = await self.post("create_user", url, json=user_data, headers=headers)
+        if response.status_code != 201:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=response.json()
+            )
+        return response.json()
 
     async def get_management_token(self) -> str:
         """
@@ -113,14 +168,13 @@ class Auth0Handler:
             "grant_type": "client_credentials"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload)
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail="Failed to get management token"
-                )
-            return response.json()["access_token"]
+        response = await self.post("management_token", url, json=payload)
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail="Failed to get management token"
+            )
+        return response.json()["access_token"]
 
     async def authorize_redirect(self, request: Request, redirect_uri: str) -> Any:
         """
@@ -157,14 +211,13 @@ class Auth0Handler:
             "redirect_uri": settings.AUTH0_CALLBACK_URL
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload)
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail="Failed to get access token"
-                )
-            return response.json()
+        response = await self.post("authorization_code", url, json=payload)
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail="Failed to get access token"
+            )
+        return response.json()
 
     async def parse_id_token(self, request: Request, token: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -178,14 +231,19 @@ class Auth0Handler:
             )
             
         try:
-            return self.verify_token(id_token)
+            return await self.verify_token(id_token)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Invalid ID token: {str(e)}"
             )
 
-auth0_handler = Auth0Handler()
+@lru_cache()
+def get_auth0_handler() -> Auth0Handler:
+    """
+    Get the shared Auth0 handler, created on first use
+    """
+    return Auth0Handler()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -193,8 +251,9 @@ async def get_current_user(
     """
     Get current user from Auth0 token
     """
+    auth0_handler = get_auth0_handler()
     token = auth0_handler.get_token_auth_header(credentials)
-    return auth0_handler.verify_token(token)
+    return await auth0_handler.verify_token(token)
 
 async def get_current_active_user(
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -203,5 +262,5 @@ async def get_current_active_user(
     Get current active user
     """
     if not current_user.get("sub"):
-        raise AuthenticationError("Invalid token")
+        raise authentication_error("Invalid token")
     return current_user 
\ No newline at end of file
@@ -2,7 +2,7 @@ from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.core.schemas.error import AuthenticationError, AuthorizationError
+from app.core.auth.auth0 import get_current_user
 
 security = HTTPBearer()
 
@@ -28,13 +28,18 @@ class BaseAuthHandler:
         
         return all(role in user["roles"] for role in required_roles)
 
+auth_handler = BaseAuthHandler()
+
 def require_permissions(required_permissions: list):
     """
     Decorator to require specific permissions
     """
     def decorator(user: Dict[str, Any] = Depends(get_current_user)):
-        if not auth0_handler.verify_permissions(user, required_permissions):
-            raise AuthorizationError("Insufficient permissions")
+        if not auth_handler.verify_permissions(user, required_permissions):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions"
+            )
         return user
     return decorator
 
@@ -43,7 +48,10 @@ def require_roles(required_roles: list):
     Decorator to require specific roles
     """
     def decorator(user: Dict[str, Any] = Depends(get_current_user)):
-        if not auth0_handler.verify_roles(user, required_roles):
-            raise AuthorizationError("Insufficient roles")
+        if not auth_handler.verify_roles(user, required_roles):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient roles"
+            )
         return user
     return decorator 
\ No newline at end of file
@@ -0,0 +1,183 @@
+import zlib
+from typing import Callable, Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=4)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+# gzip is always available; zstd and brotli need their packages installed
+CODECS: Dict[str, Callable] = {"gzip": _Gzip}
+if brotli is not None:
+    CODECS["br"] = _Brotli
+if zstandard is not None:
+    CODECS["zstd"] = _Zstd
+
+def negotiate_encoding(accept_encoding: Optional[str], preferred: Sequence[str]) -> Optional[str]:
+    """
+    Pick the first of our preferred, available encodings that the client
+    accepts with a non-zero q-value, or None for identity
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in preferred:
+        if coding in CODECS and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+class CompressionMiddleware:
+    """
+    Compress response bodies of allowlisted content types.
+
+    Whole bodies are only compressed from minimum_size bytes up. Streamed
+    bodies (more_body) are compressed chunk by chunk, each flushed so the
+    client gets it at once, e.g. every server-sent event. Responses that
+    already carry a Content-Encoding are passed through untouched.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        content_types: Sequence[str] = ("application/json",),
+        encodings: Sequence[str] = ("zstd", "br", "gzip")
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_types)
+        self.encodings = list(encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.eligible = False
+        self.started = False
+
+    def _check_eligible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        if "content-encoding" in headers or not content_type:
+            return False
+        return any(
+            content_type.startswith(allowed) for allowed in self.middleware.content_types
+        )
+
+    def _begin(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        # The compressed bytes differ, so a strong validator no longer holds
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        self.compressor = CODECS[self.encoding]()
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = MutableHeaders(raw=message["headers"])
+            self.eligible = self._check_eligible(headers)
+            # A 304 has no content type to check, but must carry the Vary
+            # the full response would have, or caches may mix up encodings
+            if self.eligible or message["status"] == 304:
+                headers.add_vary_header("Accept-Encoding")
+            if not self.eligible or not self.encoding:
+                self.started = True
+                await self.downstream(message)
+            return
+        if message["type"] != "http.response.body" or self.started and not self.compressor:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start["headers"])
+        if not self.started:
+            self.started = True
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self.downstream(self.start)
+                await self.downstream(message)
+                return
+            self._begin(headers)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.downstream(self.start)
+                await self.downstream({"type": "http.response.body", "body": body})
+                return
+            await self.downstream(self.start)
+
+        if more_body:
+            chunk = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+        await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -24,6 +24,73 @@ class Settings(BaseSettings):
     AUTH0_CLIENT_SECRET: str
     AUTH0_AUDIENCE: str
     AUTH0_ALGORITHMS: List[str] = ["RS256"]
+    JWKS_CACHE_SECONDS: int = 3600
+    JWKS_MIN_REFRESH_SECONDS: int = 60
+
+    # Item listings
+    ITEM_QUERY_SCAN_LIMIT: int = 10000
+    REPRICING_CHUNK_SIZE: int = 500
+    # A running repricing job whose lease is this old is taken as crashed
+    REPRICING_LEASE_SECONDS: int = 300
+
+    # Archival of soft-deleted rows
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_BATCH_SIZE: int = 500
+
+    # Analytics snapshots
+    SNAPSHOT_DIR: str = "snapshots"
+    SNAPSHOT_BATCH_SIZE: int = 10000
+    # Rows are exported once updated_at is this old, leaving transactions
+    # that stamped it before committing time to commit
+    SNAPSHOT_SETTLE_SECONDS: float = 300.0
+
+    # Change events
+    EVENT_BROKER_BACKEND: str = "local"
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 100
+    EVENT_STREAM_KEEPALIVE_SECONDS: float = 15.0
+
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 500
+    COMPRESSION_CONTENT_TYPES: List[str] = ["application/json", "text/"]
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]
+
+    # Server (app.launcher); 0 workers means one per core
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: float = 30.0
+
+    # Prometheus metrics, served per worker at /metrics
+    METRICS_ENABLED: bool = True
+
+    # Per-request phase timings for a sample of requests, logged and
+    # optionally returned in a Server-Timing header; 0 turns them off
+    SERVER_TIMING_SAMPLE_RATE: float = 0.01
+    SERVER_TIMING_HEADER: bool = True
+
+    # Query monitoring: slow-query log, per-request query counts and N+1
+    # detection. A budget of 0 is unlimited; routes can set their own with
+    # @query_budget. Strict mode (for tests) fails the query over budget.
+    SLOW_QUERY_MS: float = 200.0
+    QUERY_REPEAT_THRESHOLD: int = 5
+    QUERY_BUDGET_DEFAULT: int = 0
+    QUERY_BUDGET_STRICT: bool = False
+
+    # Event loop lag sampling; a stall over the threshold logs the
+    # loop thread's stack
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 50.0
+    LOOP_BLOCK_THRESHOLD_MS: float = 100.0
+
+    # Admin endpoints (/api/v1/admin); callers need all of these permissions
+    ADMIN_PERMISSIONS: List[str] = ["admin:debug"]
+    PROFILER_MAX_SECONDS: float = 60.0
+    PROFILER_TRIGGER_HEADER: str = "X-Profile"
+
+    # Worker warm-up before reporting ready
+    WARMUP_ENABLED: bool = True
+    DB_POOL_MIN_CONNECTIONS: int = 2
+    WARMUP_PATHS: List[str] = ["/healthz", "/api/openapi.json"]
     
     class Config:
         env_file = ".env"
@@ -36,4 +103,12 @@ def get_settings() -> Settings:
     """
     return Settings()
 
-settings = get_settings() 
\ No newline at end of file
+class _LazySettings:
+    """
+    Stands in for the Settings instance and builds it on first attribute
+    access, so importing a module does not read the environment
+    """
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+settings: Settings = _LazySettings()  # type: ignore[assignment] 
\ No newline at end of file
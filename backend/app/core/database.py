@@ -1,21 +1,67 @@
+import time
+from functools import lru_cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core import timing
+from app.core import query_monitor
+from app.core.metrics import db_pool_wait, instrument_engine, register_pool
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool recording how long each checkout waited for a connection
+    """
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            db_pool_wait.observe(elapsed)
+            timing.record("db_pool", elapsed)
+
+@lru_cache()
+def get_engine() -> Engine:
+    """
+    Get the database engine, creating it (and importing the DB driver)
+    on first use rather than on import
+    """
+    engine = create_engine(
+        settings.DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30,
+        pool_recycle=1800,
+    )
+    if settings.METRICS_ENABLED or settings.SERVER_TIMING_SAMPLE_RATE > 0:
+        instrument_engine(engine)
+    if settings.METRICS_ENABLED:
+        register_pool(engine)
+    query_monitor.instrument_engine(engine, settings.SLOW_QUERY_MS)
+    return engine
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800,
-)
+class _LazySessionmaker(sessionmaker):
+    """
+    Session factory that binds to the engine when the first session is made
+    """
+    def __call__(self, **local_kw) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+def __getattr__(name: str):
+    # `engine` is still importable, but only built when someone asks for it
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_db() -> Session:
     """
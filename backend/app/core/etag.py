@@ -0,0 +1,44 @@
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from the values that identify a representation's version.
+
+    ETags are weak because the same version may be sent with different
+    content encodings.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+def etag_matches(header: Optional[str], etag: str, strong: bool = False) -> bool:
+    """
+    Check an If-None-Match / If-Match header value against an ETag.
+
+    Uses weak comparison by default, as If-None-Match requires. Pass
+    strong=True for RFC 9110 strong comparison, under which weak ETags on
+    either side never match; If-Match calls for it with validators that
+    identify exact bytes. make_etag's validators identify versions, so
+    If-Match checks against them compare weakly too.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    if strong:
+        return not etag.startswith("W/") and any(
+            candidate.strip() == etag for candidate in header.split(",")
+        )
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+def not_modified(etag: str) -> Response:
+    """
+    Build an empty 304 response for a matching conditional GET
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
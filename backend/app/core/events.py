@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.config import settings
+
+Message = Dict[str, Any]
+Deliver = Callable[[str, Message], None]
+
+class BrokerBackend(ABC):
+    """
+    Transport that carries published events to every worker.
+
+    A backend receives messages through publish() and must hand each one,
+    exactly once per worker, to the deliver callback given to start().
+    """
+    @abstractmethod
+    def start(self, deliver: Deliver) -> None:
+        """
+        Begin delivering messages to this worker's broker
+        """
+
+    @abstractmethod
+    def publish(self, channel: str, message: Message) -> None:
+        """
+        Send a message to every worker, this one included
+        """
+
+    def close(self) -> None:
+        pass
+
+class LocalBrokerBackend(BrokerBackend):
+    """
+    In-process stand-in backend: delivers straight back to this worker
+    """
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, channel: str, message: Message) -> None:
+        if self._deliver:
+            self._deliver(channel, message)
+
+_BACKENDS: Dict[str, Callable[[], BrokerBackend]] = {
+    "local": LocalBrokerBackend,
+}
+
+def register_backend(name: str, factory: Callable[[], BrokerBackend]) -> None:
+    """
+    Register a cross-worker backend selectable through EVENT_BROKER_BACKEND
+    """
+    _BACKENDS[name] = factory
+
+class Subscription:
+    """
+    A single listener on a channel, bound to the event loop that created it
+    """
+    def __init__(self, channel: str, max_queue: int):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def put(self, message: Message) -> None:
+        """
+        Enqueue a message; a slow listener is told to resync instead of
+        holding back the publisher
+        """
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self) -> Message:
+        return await self.queue.get()
+
+class EventBroker:
+    """
+    Fans published events out to the subscriptions of this worker
+    """
+    def __init__(self, backend: BrokerBackend, max_queue: int = 100):
+        self.backend = backend
+        self.max_queue = max_queue
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.backend.start(self._deliver)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel, self.max_queue)
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            listeners = self._subscriptions.get(subscription.channel)
+            if listeners:
+                listeners.discard(subscription)
+                if not listeners:
+                    del self._subscriptions[subscription.channel]
+
+    def publish(self, channel: str, message: Message) -> None:
+        """
+        Publish a message; safe to call from sync code and worker threads
+        """
+        self.backend.publish(channel, message)
+
+    def _deliver(self, channel: str, message: Message) -> None:
+        with self._lock:
+            listeners = list(self._subscriptions.get(channel, ()))
+        for subscription in listeners:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+@lru_cache()
+def get_broker() -> EventBroker:
+    """
+    Get the worker-wide event broker
+    """
+    backend = _BACKENDS[settings.EVENT_BROKER_BACKEND]()
+    return EventBroker(backend, max_queue=settings.EVENT_SUBSCRIBER_QUEUE_SIZE)
+
+def item_channel(owner_id: str) -> str:
+    return f"items:{owner_id}"
+
+def format_sse(message: Message, event_id: Optional[str] = None) -> str:
+    """
+    Format a message as a server-sent event frame
+    """
+    frame = f"event: {message['type']}\n"
+    if event_id:
+        frame += f"id: {event_id}\n"
+    return frame + f"data: {json.dumps(message, separators=(',', ':'))}\n\n"
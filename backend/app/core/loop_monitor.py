@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from app.core.metrics import REGISTRY, Gauge, loop_lag
+
+logger = logging.getLogger("app.loop")
+
+# Lag percentiles are computed over this many of the latest samples
+WINDOW = 600
+
+class LoopMonitor:
+    """
+    Watch the event loop for blocking calls.
+
+    A task sleeps for interval seconds at a time and records how late it
+    wakes up: the loop's scheduling delay. A watchdog thread checks the
+    task's heartbeat; when the loop has not come back for threshold
+    seconds, some callback is blocking it, and the watchdog logs the loop
+    thread's stack while it is still stuck. One stack is logged per stall.
+    """
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: Deque[float] = deque(maxlen=WINDOW)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        REGISTRY.register(Gauge(
+            "event_loop_lag_quantile_seconds",
+            f"Event loop scheduling delay over the last {WINDOW} samples",
+            ("quantile",),
+            collect=self.quantiles
+        ))
+
+    def quantiles(self) -> Dict[Tuple[str, ...], float]:
+        samples = sorted(self.samples)
+        if not samples:
+            return {}
+        return {
+            (label,): samples[min(int(len(samples) * q), len(samples) - 1)]
+            for label, q in (("0.5", 0.5), ("0.9", 0.9), ("0.99", 0.99), ("1", 1.0))
+        }
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _measure(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._heartbeat = now
+            self.samples.append(lag)
+            loop_lag.observe(lag)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or reported == heartbeat:
+                continue
+            # The only way to read another thread's stack without stopping it
+            frame = sys._current_frames().get(self._loop_thread_id)  # pylint: disable=protected-access
+            if frame is None:
+                continue
+            reported = heartbeat
+            logger.warning(
+                "Event loop blocked for %.0f ms so far, in:\n%s",
+                stalled * 1000, "".join(traceback.format_stack(frame))
+            )
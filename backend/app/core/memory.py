@@ -0,0 +1,144 @@
+import gc
+import itertools
+import os
+import threading
+import tracemalloc
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Snapshots are large; only the latest few are kept for diffing
+MAX_SNAPSHOTS = 5
+
+# Allocations made by tracemalloc itself and by imports are noise here
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+class MemoryTracingError(Exception):
+    """
+    Raised for snapshot operations while allocation tracing is off
+    """
+
+class MemoryTracer:
+    """
+    Allocation tracing for the current worker process, on demand.
+
+    While tracing is on, every allocation records its traceback (up to
+    the given number of frames), which slows the worker down and costs
+    memory of its own; leave it on only while hunting a leak. Snapshots
+    taken meanwhile can be compared with a later state to see which
+    allocation sites grew.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """
+        Stop tracing and drop the traces and saved snapshots
+        """
+        tracemalloc.stop()
+        with self._lock:
+            self._snapshots.clear()
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise MemoryTracingError("Allocation tracing is not running")
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def save_snapshot(self) -> int:
+        """
+        Take a snapshot to diff against later and return its ID
+        """
+        snapshot = self._take()
+        with self._lock:
+            snapshot_id = next(self._ids)
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def top(self, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """
+        Get the allocation sites holding the most memory right now
+        """
+        stats = self._take().statistics(group_by)[:limit]
+        return [
+            {
+                "site": _format_traceback(stat.traceback, group_by),
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in stats
+        ]
+
+    def diff(
+        self, since: int, until: Optional[int] = None, limit: int = 20, group_by: str = "lineno"
+    ) -> List[Dict[str, Any]]:
+        """
+        Compare a saved snapshot with a later one (or the current state),
+        biggest growth first
+        """
+        with self._lock:
+            old = self._snapshots.get(since)
+            new = self._snapshots.get(until) if until is not None else None
+        if old is None or (until is not None and new is None):
+            raise KeyError(until if old is not None else since)
+        if new is None:
+            new = self._take()
+        stats = new.compare_to(old, group_by)[:limit]
+        return [
+            {
+                "site": _format_traceback(stat.traceback, group_by),
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats
+        ]
+
+    def snapshot_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._snapshots)
+
+def _format_traceback(traceback: tracemalloc.Traceback, group_by: str) -> Any:
+    if group_by == "traceback":
+        return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+    frame = traceback[0]
+    return f"{frame.filename}:{frame.lineno}" if group_by == "lineno" else frame.filename
+
+def object_counts(prefix: str = "app.", limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Count live objects of our own classes (ORM models, schemas, caches),
+    i.e. those defined in modules under the given prefix
+    """
+    counts: Counter = Counter()
+    for obj in gc.get_objects():
+        cls = type(obj)
+        # Some extension types expose __module__ as a descriptor, not a str
+        module = getattr(cls, "__module__", None)
+        if isinstance(module, str) and module.startswith(prefix):
+            counts[f"{module}.{cls.__qualname__}"] += 1
+    return [{"type": name, "count": count} for name, count in counts.most_common(limit)]
+
+def rss_bytes() -> Optional[int]:
+    """
+    Resident set size of this process, where /proc is available
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+tracer = MemoryTracer()
@@ -0,0 +1,256 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import timing
+
+# Latency buckets in seconds, from sub-millisecond queries to slow upstreams
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # One uncontended lock per family; an acquire costs well under a
+        # microsecond, cheap next to the work being measured
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in values
+        ]
+
+class Gauge(_Metric):
+    """
+    Gauge read at scrape time from a callback returning {labels: value}
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        values = self.collect() if self.collect else {}
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in values.items()
+        ]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one count per bucket (non-cumulative) plus +Inf, then sum
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(labels, list(series)) for labels, series in self._values.items()]
+        lines = self.header()
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Registry:
+    """
+    The metrics of one worker process, rendered in the Prometheus text
+    format. Each forked worker keeps its own; scrape every worker.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_requests = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP responses by route and status", ("method", "route", "status")
+))
+http_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Time to the end of the response body", ("method", "route")
+))
+db_query_duration = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("operation",)
+))
+db_pool_wait = REGISTRY.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check a connection out of the pool"
+))
+auth0_duration = REGISTRY.register(Histogram(
+    "auth0_upstream_duration_seconds", "Calls to Auth0", ("operation",)
+))
+auth0_errors = REGISTRY.register(Counter(
+    "auth0_upstream_errors_total", "Failed calls to Auth0", ("operation",)
+))
+jwt_verify_duration = REGISTRY.register(Histogram(
+    "jwt_verify_duration_seconds", "Access token verification time", ("result",)
+))
+jwks_cache = REGISTRY.register(Counter(
+    "jwks_cache_requests_total", "JWKS lookups served from cache or fetched", ("result",)
+))
+loop_lag = REGISTRY.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer due now",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+))
+
+def register_pool(engine) -> None:
+    """
+    Export the engine's pool size, checked-out and overflow connections.
+    The pool is looked up at scrape time, as dispose() replaces it.
+    """
+    def collect() -> Dict[Tuple[str, ...], float]:
+        pool = engine.pool
+        if not hasattr(pool, "checkedout"):
+            return {}
+        return {
+            ("size",): pool.size(),
+            ("checked_out",): pool.checkedout(),
+            ("overflow",): max(pool.overflow(), 0),
+            ("idle",): pool.checkedin(),
+        }
+
+    REGISTRY.register(Gauge(
+        "db_pool_connections", "Database pool connections by state", ("state",), collect=collect
+    ))
+
+def instrument_engine(engine) -> None:
+    """
+    Time every statement an engine executes, by SQL operation, and add
+    it to the current request's timings
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the execution context, so a statement that fails leaves nothing behind;
+        # SQLAlchemy has no public slot for per-statement state
+        context._query_started = time.perf_counter()  # pylint: disable=protected-access
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_query_duration.observe(elapsed, operation)
+        timing.record("db", elapsed)
+
+@contextmanager
+def track_upstream(operation: str) -> Iterator[None]:
+    """
+    Time a call to Auth0, counting it as an error if it raises
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        auth0_errors.inc(operation)
+        raise
+    finally:
+        auth0_duration.observe(time.perf_counter() - started, operation)
+
+class MetricsMiddleware:
+    """
+    Record latency and status per route template (not per raw path, which
+    would give every item its own series)
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_duration.observe(time.perf_counter() - started, scope["method"], template)
+            http_requests.inc(scope["method"], template, status)
@@ -2,7 +2,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.profiler import ProfileTriggerMiddleware
+from app.core.query_monitor import QueryMonitorMiddleware
+from app.core.timing import ServerTimingMiddleware
 
 def setup_middleware(app: FastAPI) -> None:
     """
@@ -22,4 +27,35 @@ def setup_middleware(app: FastAPI) -> None:
         SessionMiddleware,
         secret_key=settings.SECRET_KEY,
         max_age=1800,  # 30 minutes session lifetime
-    ) 
\ No newline at end of file
+    )
+
+    # Compress responses the client accepts compressed
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        content_types=settings.COMPRESSION_CONTENT_TYPES,
+        encodings=settings.COMPRESSION_ENCODINGS,
+    )
+
+    # Let a triggered profile pick out requests by header
+    app.add_middleware(ProfileTriggerMiddleware, header=settings.PROFILER_TRIGGER_HEADER)
+
+    # Count each request's queries and flag N+1 patterns
+    app.add_middleware(
+        QueryMonitorMiddleware,
+        default_budget=settings.QUERY_BUDGET_DEFAULT,
+        repeat_threshold=settings.QUERY_REPEAT_THRESHOLD,
+        strict=settings.QUERY_BUDGET_STRICT,
+    )
+
+    # Break a sample of requests down by phase
+    if settings.SERVER_TIMING_SAMPLE_RATE > 0:
+        app.add_middleware(
+            ServerTimingMiddleware,
+            sample_rate=settings.SERVER_TIMING_SAMPLE_RATE,
+            header=settings.SERVER_TIMING_HEADER,
+        )
+
+    # Outermost, so the recorded latency covers the rest of the stack
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
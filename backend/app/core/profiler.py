@@ -0,0 +1,126 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Set
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Leaf frames of threads parked waiting for work; their samples say
+# nothing about where time goes, so they are dropped
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+class ProfilerBusy(Exception):
+    """
+    Raised when a profile is requested while another one is running
+    """
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the current worker process.
+
+    A background thread snapshots every other thread's Python stack each
+    interval and counts identical stacks, which costs the profiled code
+    nothing between samples. Results are in the collapsed-stack format
+    ("root;caller;callee count" per line) read by flamegraph.pl,
+    speedscope and most other flamegraph tools.
+
+    In triggered mode, only samples taken while a request marked with the
+    trigger header is on the stack are kept. A request counts as on the
+    stack through its middleware frame, so this covers the async path:
+    async endpoints and dependencies, token verification and the ORM
+    calls made from them. Sync work handed to the threadpool is not
+    attributed to the request.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._code_labels: Dict[object, str] = {}
+        self.triggered = False
+        self.marked_frames: Set[object] = set()
+
+    def _label(self, code) -> str:
+        label = self._code_labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            cwd = os.getcwd()
+            if filename.startswith(cwd):
+                filename = filename[len(cwd) + 1:]
+            label = self._code_labels[code] = (
+                f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            )
+        return label
+
+    def _is_marked(self, frame) -> bool:
+        marked = self.marked_frames
+        while frame is not None:
+            if frame in marked:
+                return True
+            frame = frame.f_back
+        return False
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.append(thread_name)
+        return ";".join(reversed(labels))
+
+    def run(self, seconds: float, interval: float = 0.005, triggered: bool = False) -> str:
+        """
+        Sample for the given number of seconds and return the collapsed stacks
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A profile is already running in this worker")
+        try:
+            self.triggered = triggered
+            stacks: Counter = Counter()
+            own_id = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                # The only way to sample other threads' stacks from Python
+                for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                    if thread_id == own_id:
+                        continue
+                    code = frame.f_code
+                    if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                        continue
+                    if triggered and not self._is_marked(frame):
+                        continue
+                    stacks[self._collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+                time.sleep(interval)
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        finally:
+            self.triggered = False
+            self._lock.release()
+
+profiler = SamplingProfiler()
+
+class ProfileTriggerMiddleware:
+    """
+    Mark requests carrying the trigger header while a triggered profile
+    is running, so only they are sampled
+    """
+    def __init__(self, app: ASGIApp, header: str = "x-profile"):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not profiler.triggered or not any(
+            name == self.header for name, _ in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+        # This coroutine's own frame, which the request's stacks pass through
+        frame = sys._getframe()  # pylint: disable=protected-access
+        profiler.marked_frames.add(frame)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.marked_frames.discard(frame)
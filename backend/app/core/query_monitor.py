@@ -0,0 +1,153 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Callable, Optional, TypeVar
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger("app.queries")
+
+F = TypeVar("F", bound=Callable)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)")
+_NAMED = re.compile(r"%\(\w+\)s|:\w+")
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals and bound parameters become
+    ?, and IN lists of any length become (?...). Cached, as the same
+    compiled statements come back again and again.
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _NAMED.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised in strict mode by the query that takes a route over its budget
+    """
+
+def query_budget(limit: int) -> Callable[[F], F]:
+    """
+    Declare how many statements an endpoint may run per request. Put it
+    below the route decorator.
+    """
+    def decorator(endpoint: F) -> F:
+        endpoint.__query_budget__ = limit
+        return endpoint
+    return decorator
+
+class RequestQueries:
+    """
+    Statements run while handling one request
+    """
+    def __init__(self, scope: Scope, default_budget: int, strict: bool):
+        self.scope = scope
+        self.default_budget = default_budget
+        self.strict = strict
+        self.count = 0
+        self.shapes: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', None) or self.scope['path']}"
+
+    @property
+    def budget(self) -> int:
+        endpoint = self.scope.get("endpoint")
+        return getattr(endpoint, "__query_budget__", self.default_budget)
+
+    def add(self, shape: str) -> None:
+        self.count += 1
+        self.shapes[shape] += 1
+        budget = self.budget
+        if self.strict and budget and self.count > budget:
+            raise QueryBudgetExceeded(
+                f"{self.route} ran {self.count} queries, over its budget of {budget}; "
+                f"last: {shape}"
+            )
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+def instrument_engine(engine, slow_query_ms: float) -> None:
+    """
+    Count every statement against the current request, and log those
+    slower than slow_query_ms with their shape and route
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        queries = _current.get()
+        if queries is not None:
+            queries.add(normalize_sql(statement))
+        # Per-statement state lives on the execution context; there is no public slot
+        context._monitor_started = time.perf_counter()  # pylint: disable=protected-access
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_monitor_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms >= slow_query_ms:
+            queries = _current.get()
+            logger.warning(
+                "Slow query (%.1f ms) in %s: %s",
+                elapsed_ms, queries.route if queries else "-", normalize_sql(statement)
+            )
+
+class QueryMonitorMiddleware:
+    """
+    Count each request's statements; log statement shapes repeated
+    repeat_threshold times or more in one request (the N+1 pattern) and
+    requests over their query budget. With strict=True (tests), the query
+    that goes over budget raises QueryBudgetExceeded instead.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_budget: int = 0,
+        repeat_threshold: int = 5,
+        strict: bool = False
+    ):
+        self.app = app
+        self.default_budget = default_budget
+        self.repeat_threshold = repeat_threshold
+        self.strict = strict
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries(scope, self.default_budget, self.strict)
+        token = _current.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            self._report(queries)
+
+    def _report(self, queries: RequestQueries) -> None:
+        if self.repeat_threshold:
+            for shape, count in queries.shapes.items():
+                if count >= self.repeat_threshold:
+                    logger.warning(
+                        "Possible N+1 in %s: same query ran %d times: %s",
+                        queries.route, count, shape
+                    )
+        budget = queries.budget
+        if budget and queries.count > budget:
+            logger.warning(
+                "%s ran %d queries, over its budget of %d", queries.route, queries.count, budget
+            )
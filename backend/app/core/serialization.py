@@ -0,0 +1,110 @@
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, Mapping, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.core.timing import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+else:
+    DefaultJSONResponse = JSONResponse
+
+@lru_cache(maxsize=None)
+def type_adapter(type_: Any) -> TypeAdapter:
+    """
+    Get the TypeAdapter for a response type, building its validator and
+    serializer only once per process
+    """
+    return TypeAdapter(type_)
+
+@lru_cache(maxsize=None)
+def partial_model(
+    model: Type[BaseModel],
+    fields: Optional[FrozenSet[str]],
+    overrides: Tuple[Tuple[str, Any], ...] = ()
+) -> Type[BaseModel]:
+    """
+    Get a copy of a schema holding only the given fields (all of them for
+    None), optionally with some field types replaced, e.g. a list of items
+    by a list of narrowed items. Cached per field set, so each copy's
+    serializer is built once.
+    """
+    if fields is None and not overrides:
+        return model
+    replaced = dict(overrides)
+    definitions = {
+        name: (replaced.get(name, info.annotation), info)
+        for name, info in model.model_fields.items()
+        if fields is None or name in fields
+    }
+    suffix = "".join(name.title().replace("_", "") for name in definitions)
+    return create_model(
+        f"{model.__name__}{suffix}",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions
+    )
+
+def field_selection(model: Type[BaseModel]) -> Callable[..., Optional[FrozenSet[str]]]:
+    """
+    Build a dependency reading a comma-separated `fields` query parameter,
+    checked against the schema's fields
+    """
+    allowed = ", ".join(model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {allowed}")
+    ) -> Optional[FrozenSet[str]]:
+        if fields is None:
+            return None
+        selected = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        unknown = selected - model.model_fields.keys()
+        if not selected or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown
+                else "No fields requested"
+            )
+        return selected
+
+    return dependency
+
+def dump_json(type_: Any, value: Any, trusted: bool = False) -> bytes:
+    """
+    Serialize a value as the given type straight to JSON bytes.
+
+    Untrusted values (ORM rows, dicts) are validated from attributes once.
+    Trusted values must already be instances of the type, e.g. schema
+    models an endpoint built from repository output, and skip validation.
+    """
+    adapter = type_adapter(type_)
+    with timed("serialize"):
+        if not trusted:
+            value = adapter.validate_python(value, from_attributes=True)
+        return adapter.dump_json(value)
+
+def json_response(
+    type_: Any,
+    value: Any,
+    trusted: bool = False,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Build a JSON response without FastAPI's response_model round trip
+    (validate, convert to dicts, encode). Keep response_model on the route
+    for the OpenAPI schema.
+    """
+    return Response(
+        content=dump_json(type_, value, trusted),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -0,0 +1,110 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.timing")
+
+class RequestTimings:
+    """
+    Time spent per phase of one request: phase name -> [seconds, count]
+    """
+    def __init__(self):
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = [0.0, 0]
+        phase[0] += seconds
+        phase[1] += 1
+
+    def header_value(self, total: float) -> str:
+        entries = [
+            f'{name};dur={seconds * 1000:.2f};desc="{count}x"'
+            for name, (seconds, count) in self.phases.items()
+        ]
+        entries.append(f"app;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+# Set only while a sampled request is being handled; sync endpoints run in
+# a copy of the request's context, so they report into the same collector
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def record(name: str, seconds: float) -> None:
+    """
+    Add time spent in a phase to the current request, if it is sampled
+    """
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """
+    Time a block as a phase of the current request; a no-op outside
+    sampled requests
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+class ServerTimingMiddleware:
+    """
+    Collect phase timings (auth, pool wait, SQL, serialization) for a
+    sample of requests, log them as one JSON line per request and,
+    if enabled, return them in a Server-Timing header
+    """
+    def __init__(self, app: ASGIApp, sample_rate: float = 0.01, header: bool = True):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header = header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.header:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.append(
+                        "Server-Timing", timings.header_value(time.perf_counter() - started)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            logger.info(json.dumps({
+                "event": "request_timing",
+                "method": scope["method"],
+                "route": getattr(route, "path", None) or "unmatched",
+                "status": status,
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                "phases": {
+                    name: {"ms": round(seconds * 1000, 2), "count": count}
+                    for name, (seconds, count) in timings.phases.items()
+                },
+            }))
@@ -0,0 +1,86 @@
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
+
+from app.core.auth.auth0 import get_auth0_handler
+from app.core.config import settings
+from app.core.database import SessionLocal, get_engine
+from app.repositories.item import ItemRepository
+from app.repositories.user import UserRepository
+from app.schemas.item import ItemQuery
+
+logger = logging.getLogger(__name__)
+
+# Owner ID no real user has; warm-up queries find nothing under it
+WARMUP_OWNER_ID = "warmup|nobody"
+
+item_repository = ItemRepository()
+user_repository = UserRepository()
+
+def prime_pool(count: int) -> int:
+    """
+    Open up to count pooled connections at once and hand them back, so the
+    pool keeps them open for the first requests. Returns how many were opened.
+    """
+    engine = get_engine()
+    count = min(count, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+def warm_queries() -> None:
+    """
+    Run each hot read once for an owner with no rows, so its SQL is
+    compiled and lands in SQLAlchemy's statement cache
+    """
+    db = SessionLocal()
+    try:
+        item_repository.get_owner_version(db, WARMUP_OWNER_ID)
+        item_repository.read_filtered_by_owner(db, WARMUP_OWNER_ID, ItemQuery())
+        item_repository.read_many_by_owner(db, WARMUP_OWNER_ID, [WARMUP_OWNER_ID])
+        item_repository.read_owned(db, WARMUP_OWNER_ID, WARMUP_OWNER_ID)
+        item_repository.get_version(db, WARMUP_OWNER_ID, WARMUP_OWNER_ID)
+        user_repository.get_version(db, WARMUP_OWNER_ID)
+        user_repository.read_by_auth0_id(db, WARMUP_OWNER_ID)
+    finally:
+        db.close()
+
+async def warm_requests(application: FastAPI) -> None:
+    """
+    Send the WARMUP_PATHS through the whole app in-process, building the
+    middleware stack and each route's validators and serializers
+    """
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in settings.WARMUP_PATHS:
+            response = await client.get(path)
+            logger.debug("Warm-up request %s: %d", path, response.status_code)
+
+async def warm_up(application: FastAPI) -> None:
+    """
+    Pay the first-request costs before the worker reports ready. A step
+    that fails is logged and skipped; the worker still starts.
+    """
+    started = time.perf_counter()
+    steps = [
+        ("mappers", lambda: run_in_threadpool(configure_mappers)),
+        ("jwks", lambda: get_auth0_handler().get_jwks()),
+        ("pool", lambda: run_in_threadpool(prime_pool, settings.DB_POOL_MIN_CONNECTIONS)),
+        ("queries", lambda: run_in_threadpool(warm_queries)),
+        ("requests", lambda: warm_requests(application)),
+    ]
+    for name, step in steps:
+        try:
+            await step()
+        except Exception:
+            logger.warning("Warm-up step %s failed", name, exc_info=True)
+    logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - started) * 1000)
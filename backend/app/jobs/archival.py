@@ -0,0 +1,103 @@
+"""
+Archival of long soft-deleted rows out of the hot items and users tables.
+
+    python -m app.jobs.archival archive [--older-than-days N]
+    python -m app.jobs.archival restore items ITEM_ID
+
+Rows move in small batches, each its own short transaction, with an
+optional pause in between so live traffic is never locked out for long.
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.item import Item
+from app.models.user import User
+from app.repositories.archive import ArchiveRepository
+from app.repositories.item import ItemRepository
+
+logger = logging.getLogger(__name__)
+
+archive_repository = ArchiveRepository()
+item_repository = ItemRepository()
+
+# Items first, so users whose items were just archived become eligible
+ARCHIVED_MODELS = {"items": Item, "users": User}
+
+def archive_soft_deleted(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    pause: float = 0.0
+) -> dict:
+    """
+    Archive every row soft-deleted more than older_than_days ago, returning
+    the number moved per table
+    """
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = {}
+    for table_name, model in ARCHIVED_MODELS.items():
+        moved[table_name] = 0
+        while True:
+            count = archive_repository.archive_batch(db, model, cutoff, batch_size)
+            if not count:
+                break
+            moved[table_name] += count
+            logger.info("Archived %d rows from %s", moved[table_name], table_name)
+            if pause:
+                time.sleep(pause)
+    return moved
+
+def restore_row(db: Session, table_name: str, row_id: str) -> bool:
+    """
+    Bring an archived row back into its table as a live row
+    """
+    row = archive_repository.restore(db, ARCHIVED_MODELS[table_name], row_id)
+    if row is None:
+        return False
+    if table_name == "items":
+        item_repository.reinstate(db, row)
+    else:
+        db.commit()
+    return True
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive and restore soft-deleted rows")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="Move long soft-deleted rows into the archive")
+    archive.add_argument("--older-than-days", type=int, default=None)
+    archive.add_argument("--batch-size", type=int, default=None)
+    archive.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    restore = commands.add_parser("restore", help="Bring an archived row back")
+    restore.add_argument("table", choices=sorted(ARCHIVED_MODELS))
+    restore.add_argument("row_id")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        if args.command == "archive":
+            moved = archive_soft_deleted(db, args.older_than_days, args.batch_size, args.pause)
+            for table_name, count in moved.items():
+                print(f"{table_name}: archived {count} rows")
+            return 0
+
+        if not restore_row(db, args.table, args.row_id):
+            print(f"No archived {args.table} row {args.row_id}")
+            return 1
+        print(f"Restored {args.table} row {args.row_id}")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Maintenance commands for the per-owner and per-company item summaries.
+
+    python -m app.jobs.item_summaries rebuild [--owner OWNER_ID]
+    python -m app.jobs.item_summaries check
+"""
+import argparse
+import sys
+
+from app.core.database import SessionLocal
+from app.repositories.item_summary import ItemSummaryRepository
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain per-owner and per-company item summaries")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser("rebuild", help="Recompute summaries from the items table")
+    rebuild.add_argument("--owner", help="Only rebuild this owner's summary")
+    commands.add_parser("check", help="Report summaries that disagree with the items table")
+    args = parser.parse_args(argv)
+
+    repository = ItemSummaryRepository()
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            written = repository.rebuild(db, args.owner)
+            print(f"Rebuilt {written} summaries")
+            return 0
+
+        mismatches = repository.check_consistency(db)
+        for owner, stored, actual in mismatches:
+            print(f"{owner}: stored {stored}, actual {actual}")
+        print(f"{len(mismatches)} inconsistent summaries")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Bulk repricing of an owner's items.
+
+Jobs are created through the API and run in the background. A job that
+failed part way, or whose worker died (its lease expired), can be resumed
+from where it stopped:
+
+    python -m app.jobs.repricing resume JOB_ID
+"""
+import argparse
+import logging
+import sys
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.repositories.item import ItemRepository
+from app.repositories.repricing_job import RepricingJobRepository
+from app.schemas.repricing import RepricingRule
+
+logger = logging.getLogger(__name__)
+
+item_repository = ItemRepository()
+job_repository = RepricingJobRepository()
+
+def run_repricing_job(db: Session, job_id: str, chunk_size: Optional[int] = None) -> None:
+    """
+    Run or resume a job. The job is claimed first, under a lease renewed
+    with every chunk, so a run started while another live run holds the
+    job does nothing. Each chunk's UPDATE and the job's progress are
+    committed together, and progress only moves on from where this run
+    last saw it, so a rerun continues after the last finished chunk
+    without repricing anything twice.
+    """
+    chunk_size = chunk_size or settings.REPRICING_CHUNK_SIZE
+    lease_seconds = settings.REPRICING_LEASE_SECONDS
+    if not job_repository.claim(db, job_id, lease_seconds):
+        logger.info("Repricing job %s is missing, finished or held by a live run", job_id)
+        return
+    job = job_repository.get(db, job_id)
+    rule = RepricingRule(**job.rule)
+
+    try:
+        while True:
+            ids = item_repository.reprice_chunk(
+                db, job.owner_id, rule, job.last_item_id, chunk_size
+            )
+            if not ids:
+                break
+            if not job_repository.advance(db, job, ids[-1], len(ids), lease_seconds):
+                db.rollback()
+                logger.warning("Repricing job %s was taken over by another run", job_id)
+                return
+            db.commit()
+            item_repository.publish_bulk_change(job.owner_id, ids)
+            logger.info("Repricing job %s: %d/%d items", job.id, job.processed, job.total)
+        job_repository.finish(db, job, "completed")
+    except Exception as e:
+        db.rollback()
+        job_repository.finish(db, job, "failed", str(e))
+        logger.exception("Repricing job %s failed", job_id)
+        raise
+
+def run_repricing_job_in_background(job_id: str) -> None:
+    """
+    Run a job with its own session, for use as a background task
+    """
+    db = SessionLocal()
+    try:
+        run_repricing_job(db, job_id)
+    except Exception:
+        # Already recorded on the job; the API reports it from there
+        pass
+    finally:
+        db.close()
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run bulk repricing jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    resume = commands.add_parser("resume", help="Run a job from where it stopped")
+    resume.add_argument("job_id")
+    resume.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        try:
+            run_repricing_job(db, args.job_id, args.chunk_size)
+        except Exception:
+            # Recorded on the job, reported below
+            pass
+        job = job_repository.get(db, args.job_id)
+        if not job:
+            print(f"Job {args.job_id} not found")
+            return 1
+        print(f"Job {job.id}: {job.status}, {job.processed}/{job.total} items")
+        return 0 if job.status == "completed" else 1
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
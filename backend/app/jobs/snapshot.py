@@ -0,0 +1,218 @@
+"""
+Columnar snapshots of the items and users tables for analytics.
+
+    python -m app.jobs.snapshot [--full] [--dir DIR]
+
+Each run writes one zstd-compressed Parquet file per table under
+SNAPSHOT_DIR/<table>/ and records it in SNAPSHOT_DIR/manifest.json along
+with the table's updated_at high-water mark. Later runs only export rows
+changed since that mark, soft-deleted rows included, so readers can apply
+them on top of the earlier files. Rows archived away between runs are not
+seen; take a --full snapshot to start a fresh base.
+
+updated_at is stamped by the app before its transaction commits, so a
+row can turn up with an updated_at older than rows already exported. A
+run therefore only exports rows at least SNAPSHOT_SETTLE_SECONDS old and
+makes that cutoff the new mark; later rows wait for the next run.
+
+Requires pyarrow.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Optional, Type
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.base import Base
+from app.models.item import Item
+from app.models.user import User
+
+SNAPSHOT_MODELS = {"items": Item, "users": User}
+MANIFEST_NAME = "manifest.json"
+
+# pyarrow is optional and only this job needs it, so it is imported on use
+# pylint: disable=import-outside-toplevel
+
+def _arrow_schema(model: Type[Base]):
+    import pyarrow as pa
+
+    fields = []
+    for column in model.__table__.columns:
+        if isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.key, arrow_type))
+    return pa.schema(fields)
+
+def _write_file(write_path: str, schema, batches) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    with pq.ParquetWriter(write_path, schema, compression="zstd") as writer:
+        for batch in batches:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            rows += len(batch)
+    return rows
+
+def _changed_rows(
+    db: Session, model: Type[Base], since: Optional[datetime], cutoff: datetime, batch_size: int
+):
+    """
+    Yield batches of the rows with since <= updated_at < cutoff, as dicts
+    """
+    columns = [column.key for column in model.__table__.columns]
+    after = None
+    while True:
+        # Keyset over (updated_at, id) so each batch is an index range scan
+        query = select(model.__table__).where(model.updated_at < cutoff)
+        if since is not None:
+            query = query.where(model.updated_at >= since)
+        if after is not None:
+            after_updated_at, after_id = after
+            query = query.where(or_(
+                model.updated_at > after_updated_at,
+                and_(model.updated_at == after_updated_at, model.id > after_id)
+            ))
+        query = query.order_by(model.updated_at, model.id).limit(batch_size)
+        rows = [dict(zip(columns, row)) for row in db.execute(query)]
+        if not rows:
+            return
+        after = (rows[-1]["updated_at"], rows[-1]["id"])
+        yield rows
+
+def load_manifest(directory: str) -> dict:
+    """
+    Read the snapshot manifest, or start an empty one
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"tables": {}}
+    with open(path, encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
+
+def _save_manifest(directory: str, manifest: dict) -> None:
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(path + ".tmp", path)
+
+def _export(  # pylint: disable=too-many-arguments
+    directory: str, table_name: str, kind: str, started_at: datetime, *, schema, batches
+) -> Optional[dict]:
+    """
+    Write the batches to a new file under the table's directory and return
+    its manifest entry, or None if there were no rows
+    """
+    relative_path = os.path.join(
+        table_name, f"{started_at.strftime('%Y%m%dT%H%M%S%f')}-{kind}.parquet"
+    )
+    path = os.path.join(directory, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = _write_file(path + ".tmp", schema, batches)
+    if not rows:
+        os.remove(path + ".tmp")
+        return None
+    os.replace(path + ".tmp", path)
+    return {
+        "path": relative_path,
+        "kind": kind,
+        "rows": rows,
+        "created_at": started_at.isoformat(),
+    }
+
+def snapshot_table(  # pylint: disable=too-many-arguments
+    db: Session,
+    directory: str,
+    table_name: str,
+    manifest: dict,
+    *,
+    full: bool = False,
+    batch_size: Optional[int] = None,
+    settle_seconds: Optional[float] = None
+) -> int:
+    """
+    Export one table's rows changed since its high-water mark (or all of
+    them with full=True), up to settle_seconds ago, and record the file in
+    the manifest. Returns the number of rows written.
+    """
+    model = SNAPSHOT_MODELS[table_name]
+    batch_size = batch_size or settings.SNAPSHOT_BATCH_SIZE
+    if settle_seconds is None:
+        settle_seconds = settings.SNAPSHOT_SETTLE_SECONDS
+    entry = manifest["tables"].setdefault(table_name, {"watermark": None, "files": []})
+    watermark = None if full else entry["watermark"]
+    since = datetime.fromisoformat(watermark["updated_at"]) if watermark else None
+    started_at = datetime.utcnow()
+    cutoff = started_at - timedelta(seconds=settle_seconds)
+    # A clock behind the last run's must not move the mark back
+    next_watermark = {"updated_at": (max(cutoff, since) if since else cutoff).isoformat()}
+
+    file_entry = _export(
+        directory, table_name, "incremental" if watermark else "full", started_at,
+        schema=_arrow_schema(model), batches=_changed_rows(db, model, since, cutoff, batch_size)
+    )
+    if file_entry is None:
+        if watermark:
+            entry["watermark"] = next_watermark
+        return 0
+    if file_entry["kind"] == "full":
+        entry["files"] = []
+    entry["files"].append(file_entry)
+    entry["watermark"] = next_watermark
+    return file_entry["rows"]
+
+def take_snapshot(db: Session, directory: Optional[str] = None, full: bool = False) -> dict:
+    """
+    Snapshot every table and save the manifest, returning rows per table
+    """
+    directory = directory or settings.SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+    manifest = load_manifest(directory)
+    written = {
+        table_name: snapshot_table(db, directory, table_name, manifest, full=full)
+        for table_name in SNAPSHOT_MODELS
+    }
+    _save_manifest(directory, manifest)
+    return written
+
+def main(argv=None) -> int:
+    """
+    Command line entry point; returns the exit status
+    """
+    parser = argparse.ArgumentParser(description="Write columnar snapshots of items and users")
+    parser.add_argument(
+        "--full", action="store_true", help="Export every row instead of changes only"
+    )
+    parser.add_argument("--dir", default=None, help="Snapshot directory (default: SNAPSHOT_DIR)")
+    args = parser.parse_args(argv)
+
+    try:
+        import pyarrow  # pylint: disable=unused-import
+    except ImportError:
+        print("Snapshots need pyarrow: pip install pyarrow")
+        return 1
+
+    db = SessionLocal()
+    try:
+        for table_name, rows in take_snapshot(db, args.dir, args.full).items():
+            print(f"{table_name}: {rows} rows")
+        return 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Production entry point for the app package.
+
+    python -m app.launcher [--host HOST] [--port PORT] [--workers N] [--reuse-port]
+
+The app is imported once in the master process and workers are forked
+from it, so they start without repeating the imports. Each worker runs
+uvicorn, with uvloop and httptools when they are installed. Workers share
+one listening socket, or with --reuse-port bind their own SO_REUSEPORT
+sockets and let the kernel balance connections between them.
+
+On SIGTERM or SIGINT the master passes SIGTERM on to the workers; each
+stops accepting connections, waits up to --graceful-timeout seconds for
+in-flight requests and then runs the app's shutdown, which closes its
+database pool. Workers that die are replaced.
+
+POSIX only (needs fork).
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.database import get_engine
+
+logger = logging.getLogger("app.launcher")
+
+# A worker exiting sooner than this after it started is taken as a startup
+# failure rather than a crash, and stops the launcher instead of respawning
+MIN_WORKER_UPTIME_SECONDS = 5.0
+
+def default_workers() -> int:
+    """
+    One worker per core available to this process
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+def bind_socket(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    """
+    Open a listening socket that forked workers inherit
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock: Optional[socket.socket], args: argparse.Namespace) -> None:
+    """
+    Serve the preloaded app in a forked worker until told to stop
+    """
+    # Connections opened before the fork belong to the master
+    get_engine().dispose(close=False)
+    if sock is None:
+        sock = bind_socket(args.host, args.port, reuse_port=True)
+    config = uvicorn.Config(
+        app,
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        log_level=args.log_level,
+        proxy_headers=True,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    if not server.started:
+        # uvicorn returns quietly when the app's startup fails
+        raise RuntimeError("Worker failed to start")
+
+def worker_process(app, sock: Optional[socket.socket], args: argparse.Namespace) -> None:
+    """
+    Body of a forked worker: run it, then exit the process without
+    returning into the master's code, with a non-zero status if it failed
+    """
+    code = 1
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        run_worker(app, sock, args)
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except BaseException:  # pylint: disable=broad-exception-caught
+        logger.exception("Worker %d crashed", os.getpid())
+    finally:
+        os._exit(code)
+
+def main(argv=None) -> int:
+    """
+    Parse the command line, fork the workers and keep them running
+    until told to stop; returns the launcher's exit status
+    """
+    parser = argparse.ArgumentParser(description="Serve the API with a pool of preforked workers")
+    parser.add_argument("--host", default=settings.SERVER_HOST, help="Address to bind")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT, help="Port to bind")
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS or default_workers(),
+        help="Worker processes (default: SERVER_WORKERS, or one per core)"
+    )
+    parser.add_argument(
+        "--reuse-port", action="store_true",
+        help="Give each worker its own SO_REUSEPORT socket instead of sharing one"
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=float, default=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        help="Seconds a stopping worker waits for in-flight requests"
+    )
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(message)s")
+
+    # Preload: import the app once, before forking, but only once the
+    # command line is known to be good
+    from app.main import app  # pylint: disable=import-outside-toplevel
+
+    shared = None if args.reuse_port else bind_socket(args.host, args.port)
+    workers: Dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            worker_process(app, shared, args)
+        workers[pid] = time.monotonic()
+
+    def stop(_signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Starting %d workers on %s:%d", args.workers, args.host, args.port)
+    for _ in range(args.workers):
+        spawn()
+
+    failed = False
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started_at = workers.pop(pid, None)
+        if stopping or started_at is None:
+            continue
+        if time.monotonic() - started_at < MIN_WORKER_UPTIME_SECONDS:
+            logger.error("Worker %d failed to start (status %d); stopping", pid, status)
+            failed = True
+            stop(signal.SIGTERM, None)
+            continue
+        logger.warning("Worker %d exited (status %d); starting a new one", pid, status)
+        spawn()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,42 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.core.config import settings
+from app.core.database import get_engine
 from app.api.v1.api import api_router
 from app.core.middleware import setup_middleware
 from app.core.exceptions import setup_exception_handlers
+from app.core.loop_monitor import LoopMonitor
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+from app.core.serialization import DefaultJSONResponse
+from app.core.warmup import warm_up
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """
+    Application startup and shutdown
+    """
+    application.state.ready = False
+    monitor = None
+    if settings.LOOP_MONITOR_ENABLED:
+        monitor = LoopMonitor(
+            interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+            threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000
+        )
+        monitor.start()
+    if settings.WARMUP_ENABLED:
+        await warm_up(application)
+    application.state.ready = True
+    yield
+    application.state.ready = False
+    if monitor is not None:
+        await monitor.stop()
+    # In-flight requests have drained by now; close pooled connections
+    get_engine().dispose()
 
 def create_application() -> FastAPI:
     """
@@ -17,7 +48,9 @@ def create_application() -> FastAPI:
         version="0.1.0",
         docs_url="/api/docs",
         redoc_url="/api/redoc",
-        openapi_url="/api/openapi.json"
+        openapi_url="/api/openapi.json",
+        default_response_class=DefaultJSONResponse,
+        lifespan=lifespan
     )
 
     # Setup middleware
@@ -45,3 +78,17 @@ app.add_middleware(
 @app.get("/healthz")
 async def healthz():
     return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz(request: Request):
+    # Ready once warm-up has finished, and no longer once shutdown starts
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "unavailable"}
+        )
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # This worker's metrics only; each worker is scraped on its own
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
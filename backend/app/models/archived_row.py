@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Index, LargeBinary, String
+
+from app.models.base import Base
+
+class ArchivedRow(Base):
+    """
+    A soft-deleted row moved out of its hot table, kept for restores.
+    created_at records when it was archived.
+    """
+    __tablename__ = "archived_rows"
+    __table_args__ = (
+        Index("ix_archived_rows_table_name_row_id", "table_name", "row_id"),
+    )
+
+    table_name = Column(String, nullable=False)
+    row_id = Column(String, nullable=False)
+    # zlib-compressed JSON of the row's columns
+    payload = Column(LargeBinary, nullable=False)
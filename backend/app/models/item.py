@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, String, ForeignKey
+from sqlalchemy import DDL, Column, Float, Index, String, ForeignKey, event, text
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -8,6 +8,22 @@ class Item(Base):
     Item model for storing item information
     """
     __tablename__ = "items"
+    __table_args__ = (
+        # Serves the per-owner change feed keyset: (updated_at, id) > cursor
+        Index("ix_items_owner_id_updated_at", "owner_id", "updated_at", "id"),
+        # Serve filtered and sorted listings within one owner's items
+        Index("ix_items_owner_id_name", "owner_id", "name"),
+        Index("ix_items_owner_id_price", "owner_id", "price"),
+        Index("ix_items_owner_id_created_at", "owner_id", "created_at"),
+        # Table-wide (updated_at, id) keyset for incremental snapshots
+        Index("ix_items_updated_at", "updated_at", "id"),
+        # Partial: only dead rows waiting for archival are indexed
+        Index(
+            "ix_items_deleted_at", "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"),
+            postgresql_where=text("deleted_at IS NOT NULL")
+        ),
+    )
 
     id = Column(String, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -16,4 +32,19 @@ class Item(Base):
     tax = Column(Float, nullable=True)
     owner_id = Column(String, ForeignKey("users.id"), nullable=True)
 
-    owner = relationship("User", back_populates="items") 
\ No newline at end of file
+    owner = relationship("User", back_populates="items")
+
+# Full-text index over name and description. SQLite keeps a separate FTS5
+# table that ItemRepository writes to; PostgreSQL uses an expression GIN
+# index that the database maintains itself.
+event.listen(Item.__table__, "after_create", DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+    "name, description, item_id UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+).execute_if(dialect="sqlite"))
+event.listen(Item.__table__, "after_create", DDL(
+    "CREATE INDEX IF NOT EXISTS ix_items_search ON items USING gin ("
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '')))"
+).execute_if(dialect="postgresql"))
+event.listen(Item.__table__, "before_drop", DDL(
+    "DROP TABLE IF EXISTS items_fts"
+).execute_if(dialect="sqlite"))
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Float, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+class ItemOwnerSummary(Base):
+    """
+    Per-owner item aggregates, maintained by the item write paths
+    """
+    __tablename__ = "item_owner_summaries"
+
+    # The owner's user ID
+    id = Column(String, ForeignKey("users.id"), primary_key=True, index=True)
+    item_count = Column(Integer, default=0, nullable=False)
+    price_total = Column(Float, default=0.0, nullable=False)
+    tax_total = Column(Float, default=0.0, nullable=False)
+
+class ItemCompanySummary(Base):
+    """
+    Per-company item aggregates over the company's live users, maintained
+    alongside ItemOwnerSummary
+    """
+    __tablename__ = "item_company_summaries"
+
+    # The company name, as on User.company
+    id = Column(String, primary_key=True, index=True)
+    item_count = Column(Integer, default=0, nullable=False)
+    price_total = Column(Float, default=0.0, nullable=False)
+    tax_total = Column(Float, default=0.0, nullable=False)
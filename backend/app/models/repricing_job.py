@@ -0,0 +1,22 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+class RepricingJob(Base):
+    """
+    Progress of a bulk repricing run over an owner's items
+    """
+    __tablename__ = "repricing_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    owner_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    rule = Column(JSON, nullable=False)
+    status = Column(String, default="pending", nullable=False)
+    # Keyset position: every matching item with a smaller ID is done
+    last_item_id = Column(String, nullable=True)
+    processed = Column(Integer, default=0, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+    # Held by the run working on the job and renewed after every chunk; a
+    # running job with an expired lease lost its worker and can be resumed
+    lease_until = Column(DateTime, nullable=True)
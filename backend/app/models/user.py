@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String
+from sqlalchemy import Boolean, Column, Index, String, text
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -8,6 +8,16 @@ class User(Base):
     User model for storing user information
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Table-wide (updated_at, id) keyset for incremental snapshots
+        Index("ix_users_updated_at", "updated_at", "id"),
+        # Partial: only dead rows waiting for archival are indexed
+        Index(
+            "ix_users_deleted_at", "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"),
+            postgresql_where=text("deleted_at IS NOT NULL")
+        ),
+    )
 
     id = Column(String, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
@@ -0,0 +1,109 @@
+import json
+import zlib
+from datetime import datetime
+from typing import List, Optional, Sequence, Type
+from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, delete, exists, select
+
+from app.models.archived_row import ArchivedRow
+from app.models.base import Base
+from app.models.item import Item
+from app.models.item_summary import ItemOwnerSummary
+from app.models.repricing_job import RepricingJob
+from app.models.user import User
+from app.repositories.base import BaseRepository
+
+class ArchiveRepository(BaseRepository[ArchivedRow]):
+    """
+    Repository for ArchivedRow model: moves long soft-deleted rows out of
+    their hot tables and back
+    """
+    def __init__(self):
+        super().__init__(ArchivedRow)
+
+    def _pack(self, row: Base) -> bytes:
+        values = {}
+        for column in row.__table__.columns:
+            value = getattr(row, column.key)
+            values[column.key] = value.isoformat() if isinstance(value, datetime) else value
+        return zlib.compress(json.dumps(values, separators=(",", ":")).encode())
+
+    def _unpack(self, model: Type[Base], payload: bytes) -> Base:
+        values = json.loads(zlib.decompress(payload))
+        for column in model.__table__.columns:
+            if isinstance(column.type, DateTime) and values.get(column.key):
+                values[column.key] = datetime.fromisoformat(values[column.key])
+        return model(**values)
+
+    def _archive_rows(self, db: Session, model: Type[Base], rows: Sequence[Base]) -> None:
+        db.add_all(
+            self.model(table_name=model.__tablename__, row_id=str(row.id), payload=self._pack(row))
+            for row in rows
+        )
+        db.execute(
+            delete(model).where(model.id.in_([row.id for row in rows])),
+            execution_options={"synchronize_session": False}
+        )
+
+    def _archive_user_dependents(self, db: Session, user_ids: List[str]) -> None:
+        """
+        Clear the rows referencing users about to be archived: their
+        repricing jobs are archived with them, and their item summaries
+        (all zero, as they have no items left) are dropped
+        """
+        jobs = db.execute(
+            select(RepricingJob).where(RepricingJob.owner_id.in_(user_ids))
+        ).scalars().all()
+        if jobs:
+            self._archive_rows(db, RepricingJob, jobs)
+        db.execute(
+            delete(ItemOwnerSummary).where(ItemOwnerSummary.id.in_(user_ids)),
+            execution_options={"synchronize_session": False}
+        )
+        for job in jobs:
+            db.expunge(job)
+
+    def archive_batch(
+        self, db: Session, model: Type[Base], cutoff: datetime, batch_size: int
+    ) -> int:
+        """
+        Move up to batch_size rows soft-deleted before cutoff into the
+        archive, in one short transaction. Returns the number moved.
+        Archived users take their repricing jobs and summary rows with
+        them, which would otherwise break their foreign keys.
+        """
+        query = select(model).where(
+            model.deleted_at.isnot(None),
+            model.deleted_at < cutoff
+        )
+        if model is User:
+            # Keep users whose items are still in the hot table
+            query = query.where(~exists().where(Item.owner_id == User.id))
+        rows = db.execute(query.limit(batch_size)).scalars().all()
+        if not rows:
+            return 0
+        if model is User:
+            self._archive_user_dependents(db, [row.id for row in rows])
+        self._archive_rows(db, model, rows)
+        db.commit()
+        for row in rows:
+            db.expunge(row)
+        return len(rows)
+
+    def restore(self, db: Session, model: Type[Base], row_id: str) -> Optional[Base]:
+        """
+        Put the most recently archived copy of a row back into its table as
+        a live row. The caller commits.
+        """
+        archived = db.query(self.model).filter(
+            self.model.table_name == model.__tablename__,
+            self.model.row_id == row_id
+        ).order_by(self.model.id.desc()).first()
+        if not archived:
+            return None
+        row = self._unpack(model, archived.payload)
+        row.deleted_at = None
+        row.updated_at = datetime.utcnow()
+        db.add(row)
+        db.delete(archived)
+        return row
@@ -1,6 +1,6 @@
-from typing import Generic, TypeVar, Type, Optional, List
+from typing import AbstractSet, Generic, TypeVar, Type, Optional, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete
+from sqlalchemy import Row, select, update, delete
 from datetime import datetime
 
 from app.models.base import Base
@@ -11,11 +11,41 @@ class BaseRepository(Generic[ModelType]):
     """
     Base repository class with common CRUD operations
     """
+    # Columns the read_* methods select, normally the response schema's
+    # fields; None selects every column
+    read_columns: Optional[Tuple[str, ...]] = None
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def read_projection(self, fields: Optional[AbstractSet[str]] = None) -> list:
+        """
+        Get the columns selected by the read-only read_* methods, narrowed
+        to the requested fields if given; id is always selected
+        """
+        table = self.model.__table__
+        names = self.read_columns or [column.key for column in table.columns]
+        if fields is not None:
+            names = [name for name in names if name in fields or name == "id"]
+        return [table.columns[name] for name in names]
+
+    def read(
+        self, db: Session, id: int, fields: Optional[AbstractSet[str]] = None
+    ) -> Optional[Row]:
+        """
+        Read-only get: selects only read_columns and returns a compact Row,
+        without building an ORM instance or touching the identity map
+        """
+        return db.execute(select(*self.read_projection(fields)).where(
+            self.model.id == id,
+            self.model.deleted_at.is_(None)
+        )).first()
+
     def get(self, db: Session, id: int) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+        return db.query(self.model).filter(
+            self.model.id == id,
+            self.model.deleted_at.is_(None)
+        ).first()
 
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
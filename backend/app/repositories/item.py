@@ -1,17 +1,32 @@
-from typing import List, Optional
+import uuid
+from datetime import datetime
+from typing import AbstractSet, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import Row, Select, select, and_, func, or_, update
 
+from app.core.config import settings
+from app.core.events import get_broker, item_channel
+from app.core.pagination import encode_cursor
 from app.models.item import Item
 from app.repositories.base import BaseRepository
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.repositories.item_summary import ItemSummaryRepository
+from app.repositories.search import ItemSearchIndex
+from app.schemas.item import ItemChange, ItemCreate, ItemQuery, ItemUpdate
+from app.schemas.repricing import RepricingRule
 
 class ItemRepository(BaseRepository[Item]):
     """
     Repository for Item model
     """
+    # Keeps IN lists under SQLite's bound parameter limit
+    IN_CHUNK_SIZE = 500
+    # Item schema fields, plus updated_at for ETags
+    read_columns = ("id", "owner_id", "name", "description", "price", "tax", "updated_at")
+
     def __init__(self):
         super().__init__(Item)
+        self.search_index = ItemSearchIndex()
+        self.summaries = ItemSummaryRepository()
 
     def get_by_owner(self, db: Session, owner_id: str, skip: int = 0, limit: int = 100) -> List[Item]:
         """
@@ -22,14 +37,256 @@ class ItemRepository(BaseRepository[Item]):
             self.model.deleted_at.is_(None)
         ).offset(skip).limit(limit).all()
 
+    def read_by_owner(
+        self,
+        db: Session,
+        owner_id: str,
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        fields: Optional[AbstractSet[str]] = None
+    ) -> List[Row]:
+        """
+        Read-only get_by_owner, returning compact rows of read_columns
+        """
+        return db.execute(select(*self.read_projection(fields)).where(
+            self.model.owner_id == owner_id,
+            self.model.deleted_at.is_(None)
+        ).offset(skip).limit(limit)).all()
+
+    def filter_by_owner(
+        self, db: Session, owner_id: str, query: ItemQuery, skip: int = 0, limit: int = 100
+    ) -> List[Item]:
+        """
+        Get an owner's live items matching the filters, in the requested order
+        """
+        statement = self._filter_statement(db, owner_id, query)
+        return db.execute(statement.offset(skip).limit(limit)).scalars().all()
+
+    def read_filtered_by_owner(
+        self,
+        db: Session,
+        owner_id: str,
+        query: ItemQuery,
+        skip: int = 0,
+        limit: int = 100,
+        fields: Optional[AbstractSet[str]] = None
+    ) -> List[Row]:
+        """
+        Read-only filter_by_owner, returning compact rows of read_columns
+        (or only the requested fields)
+        """
+        statement = self._filter_statement(db, owner_id, query) \
+            .with_only_columns(*self.read_projection(fields))
+        return db.execute(statement.offset(skip).limit(limit)).all()
+
+    def _filter_statement(self, db: Session, owner_id: str, query: ItemQuery) -> Select:
+        """
+        Build the SELECT for an owner's filtered, sorted listing.
+
+        Each sortable or range-filterable column has an (owner_id, column)
+        index. A query that one such index cannot serve on its own (an
+        unindexed predicate, or filters and sort spread over several
+        columns) is refused for owners with more than
+        ITEM_QUERY_SCAN_LIMIT items, raising ValueError.
+        """
+        column_filters = {
+            "price": (query.price_min, query.price_max),
+            "created_at": (query.created_after, query.created_before),
+            "updated_at": (query.updated_after, query.updated_before),
+        }
+        conditions = [
+            self.model.owner_id == owner_id,
+            self.model.deleted_at.is_(None)
+        ]
+        indexed_columns = set()
+        for name, (low, high) in column_filters.items():
+            column = getattr(self.model, name)
+            if low is not None:
+                conditions.append(column >= low)
+            if high is not None:
+                conditions.append(column <= high if name == "price" else column < high)
+            if low is not None or high is not None:
+                indexed_columns.add(name)
+        if query.name_prefix:
+            # A range rather than LIKE so the (owner_id, name) index applies
+            conditions.append(self.model.name >= query.name_prefix)
+            conditions.append(self.model.name < query.name_prefix + "\U0010ffff")
+            indexed_columns.add("name")
+
+        unindexed = False
+        if query.tax_min is not None:
+            conditions.append(self.model.tax >= query.tax_min)
+            unindexed = True
+        if query.tax_max is not None:
+            conditions.append(self.model.tax <= query.tax_max)
+            unindexed = True
+        if query.name_contains:
+            pattern = query.name_contains.replace("\\", "\\\\") \
+                .replace("%", "\\%").replace("_", "\\_")
+            conditions.append(self.model.name.like(f"%{pattern}%", escape="\\"))
+            unindexed = True
+
+        sort_column = query.sort.lstrip("-") if query.sort else None
+        if sort_column:
+            indexed_columns.add(sort_column)
+        if (unindexed or len(indexed_columns) > 1) \
+                and self.count_by_owner(db, owner_id, settings.ITEM_QUERY_SCAN_LIMIT + 1) \
+                > settings.ITEM_QUERY_SCAN_LIMIT:
+            raise ValueError(
+                "This filter and sort combination needs a scan over too many items; "
+                "narrow it to a single indexed column (name, price, created_at or updated_at)"
+            )
+
+        statement = select(self.model).where(*conditions)
+        if sort_column:
+            column = getattr(self.model, sort_column)
+            if query.sort.startswith("-"):
+                statement = statement.order_by(column.desc(), self.model.id.desc())
+            else:
+                statement = statement.order_by(column, self.model.id)
+        return statement
+
+    def count_by_owner(self, db: Session, owner_id: str, cap: int) -> int:
+        """
+        Count an owner's live items, stopping early once cap is reached
+        """
+        bounded = select(self.model.id).where(
+            self.model.owner_id == owner_id,
+            self.model.deleted_at.is_(None)
+        ).limit(cap).subquery()
+        return db.execute(select(func.count()).select_from(bounded)).scalar()
+
+    def get_owned(self, db: Session, id: str, owner_id: str) -> Optional[Item]:
+        """
+        Get a live item by ID, only if it belongs to the given owner
+        """
+        return db.query(self.model).filter(
+            self.model.id == id,
+            self.model.owner_id == owner_id,
+            self.model.deleted_at.is_(None)
+        ).first()
+
+    def read_owned(self, db: Session, id: str, owner_id: str) -> Optional[Row]:
+        """
+        Read-only get_owned, returning a compact row of read_columns
+        """
+        return db.execute(select(*self.read_projection()).where(
+            self.model.id == id,
+            self.model.owner_id == owner_id,
+            self.model.deleted_at.is_(None)
+        )).first()
+
+    def get_many_by_owner(self, db: Session, owner_id: str, ids: List[str]) -> List[Item]:
+        """
+        Get the live items among the given IDs that belong to the owner,
+        in a single IN query per chunk of IDs (in no particular order)
+        """
+        items = []
+        for start in range(0, len(ids), self.IN_CHUNK_SIZE):
+            items.extend(db.query(self.model).filter(
+                self.model.id.in_(ids[start:start + self.IN_CHUNK_SIZE]),
+                self.model.owner_id == owner_id,
+                self.model.deleted_at.is_(None)
+            ).all())
+        return items
+
+    def read_many_by_owner(
+        self,
+        db: Session,
+        owner_id: str,
+        ids: List[str],
+        fields: Optional[AbstractSet[str]] = None
+    ) -> List[Row]:
+        """
+        Read-only get_many_by_owner, returning compact rows of read_columns
+        (or only the requested fields)
+        """
+        rows = []
+        for start in range(0, len(ids), self.IN_CHUNK_SIZE):
+            rows.extend(db.execute(select(*self.read_projection(fields)).where(
+                self.model.id.in_(ids[start:start + self.IN_CHUNK_SIZE]),
+                self.model.owner_id == owner_id,
+                self.model.deleted_at.is_(None)
+            )).all())
+        return rows
+
+    def search(
+        self, db: Session, owner_id: str, query: str,
+        after: Optional[Tuple[float, str]] = None, limit: int = 20
+    ) -> List[Tuple[Row, float]]:
+        """
+        Full-text search over an owner's items, returning (row, score) pairs
+        best match first; rows are read-only, as from read_many_by_owner
+        """
+        hits = self.search_index.search(db, owner_id, query, after, limit)
+        found = {item.id: item for item in self.read_many_by_owner(db, owner_id, [id for id, _ in hits])}
+        return [(found[id], score) for id, score in hits if id in found]
+
+    def get_version(self, db: Session, id: str, owner_id: str) -> Optional[datetime]:
+        """
+        Get only the updated_at of a live owned item, without loading the row
+        """
+        return db.query(self.model.updated_at).filter(
+            self.model.id == id,
+            self.model.owner_id == owner_id,
+            self.model.deleted_at.is_(None)
+        ).scalar()
+
+    def get_owner_version(self, db: Session, owner_id: str) -> Tuple[int, Optional[datetime]]:
+        """
+        Get the row count and latest updated_at across an owner's items.
+
+        Soft-deleted rows are counted as well, since deleting an item bumps
+        its updated_at and so changes the owner's listing.
+        """
+        count, latest = db.query(
+            func.count(self.model.id), func.max(self.model.updated_at)
+        ).filter(self.model.owner_id == owner_id).one()
+        return count, latest
+
+    def get_changes(
+        self,
+        db: Session,
+        owner_id: str,
+        since_updated_at: Optional[datetime] = None,
+        since_id: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Item]:
+        """
+        Get items created, updated or soft-deleted after the (updated_at, id)
+        keyset position, oldest change first. Soft-deleted rows are included
+        so callers can emit tombstones.
+        """
+        query = db.query(self.model).filter(self.model.owner_id == owner_id)
+        if since_updated_at is not None:
+            query = query.filter(or_(
+                self.model.updated_at > since_updated_at,
+                and_(
+                    self.model.updated_at == since_updated_at,
+                    self.model.id > since_id
+                )
+            ))
+        return query.order_by(
+            self.model.updated_at, self.model.id
+        ).limit(limit).all()
+
     def create_with_owner(self, db: Session, obj_in: ItemCreate, owner_id: str) -> Item:
         """
         Create a new item with owner
         """
-        db_obj = self.model(**obj_in.model_dump(), owner_id=owner_id)
+        # The ID is needed before flush, to key the search index entry; one
+        # timestamp for both columns marks the change feed entry as a create
+        now = datetime.utcnow()
+        db_obj = self.model(
+            id=str(uuid.uuid4()), **obj_in.model_dump(), owner_id=owner_id,
+            created_at=now, updated_at=now
+        )
         db.add(db_obj)
+        self.search_index.upsert(db, db_obj)
+        self.summaries.apply_delta(db, owner_id, 1, db_obj.price or 0.0, db_obj.tax or 0.0)
         db.commit()
         db.refresh(db_obj)
+        self.publish_change(db_obj, "item.created")
         return db_obj
 
     def update(self, db: Session, id: str, obj_in: ItemUpdate) -> Optional[Item]:
@@ -38,9 +295,160 @@ class ItemRepository(BaseRepository[Item]):
         """
         db_obj = self.get(db, id)
         if db_obj:
-            update_data = obj_in.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_obj, key, value)
-            db.commit()
-            db.refresh(db_obj)
-        return db_obj 
\ No newline at end of file
+            self.update_instance(db, db_obj, obj_in)
+        return db_obj
+
+    def update_instance(self, db: Session, db_obj: Item, obj_in: ItemUpdate) -> Item:
+        """
+        Update an item already loaded in this session, e.g. by get_owned,
+        without selecting it again
+        """
+        update_data = obj_in.model_dump(exclude_unset=True)
+        old_price, old_tax = db_obj.price or 0.0, db_obj.tax or 0.0
+        for key, value in update_data.items():
+            setattr(db_obj, key, value)
+        if "name" in update_data or "description" in update_data:
+            self.search_index.upsert(db, db_obj)
+        if db_obj.owner_id and db_obj.deleted_at is None:
+            self.summaries.apply_delta(
+                db, db_obj.owner_id, 0,
+                (db_obj.price or 0.0) - old_price, (db_obj.tax or 0.0) - old_tax
+            )
+        db.commit()
+        db.refresh(db_obj)
+        self.publish_change(db_obj, "item.updated")
+        return db_obj
+
+    def soft_delete(self, db: Session, id: str) -> bool:
+        """
+        Soft delete an item and announce its tombstone
+        """
+        db_obj = self.get(db, id)
+        if not db_obj:
+            return False
+        self.soft_delete_instance(db, db_obj)
+        return True
+
+    def soft_delete_instance(self, db: Session, db_obj: Item) -> None:
+        """
+        Soft delete an item already loaded in this session
+        """
+        if db_obj.deleted_at is None and db_obj.owner_id:
+            self.summaries.apply_delta(
+                db, db_obj.owner_id, -1, -(db_obj.price or 0.0), -(db_obj.tax or 0.0)
+            )
+        db_obj.deleted_at = datetime.utcnow()
+        self.search_index.remove(db, db_obj.id)
+        db.commit()
+        db.refresh(db_obj)
+        self.publish_change(db_obj, "item.deleted")
+
+    def _repricing_conditions(self, owner_id: str, rule: RepricingRule) -> list:
+        conditions = [
+            self.model.owner_id == owner_id,
+            self.model.deleted_at.is_(None)
+        ]
+        if rule.name_prefix:
+            conditions.append(self.model.name >= rule.name_prefix)
+            conditions.append(self.model.name < rule.name_prefix + "\U0010ffff")
+        if rule.price_min is not None:
+            conditions.append(self.model.price >= rule.price_min)
+        if rule.price_max is not None:
+            conditions.append(self.model.price <= rule.price_max)
+        return conditions
+
+    def count_for_repricing(self, db: Session, owner_id: str, rule: RepricingRule) -> int:
+        """
+        Count the owner's items a repricing rule applies to
+        """
+        return db.query(func.count(self.model.id)).filter(
+            *self._repricing_conditions(owner_id, rule)
+        ).scalar()
+
+    def reprice_chunk(
+        self,
+        db: Session,
+        owner_id: str,
+        rule: RepricingRule,
+        after_id: Optional[str],
+        chunk_size: int
+    ) -> List[str]:
+        """
+        Apply a repricing rule to the next chunk of matching items, in ID
+        order after after_id, with one set-based UPDATE. Summary totals are
+        adjusted in the same transaction; the caller commits. Returns the
+        IDs of the repriced items, empty once the rule is exhausted.
+        """
+        conditions = self._repricing_conditions(owner_id, rule)
+        if after_id is not None:
+            conditions.append(self.model.id > after_id)
+        ids = list(db.execute(
+            select(self.model.id).where(*conditions).order_by(self.model.id).limit(chunk_size)
+        ).scalars())
+        if not ids:
+            return ids
+
+        price = self.model.price
+        if rule.percent_change is not None:
+            price = price * (1 + rule.percent_change / 100)
+        if rule.round_to:
+            price = func.round(price / rule.round_to) * rule.round_to
+        values = {"price": price, "updated_at": datetime.utcnow()}
+        if rule.tax_rate is not None:
+            values["tax"] = price * rule.tax_rate
+
+        totals = select(
+            func.coalesce(func.sum(self.model.price), 0.0),
+            func.coalesce(func.sum(self.model.tax), 0.0)
+        ).where(self.model.id.in_(ids))
+        price_before, tax_before = db.execute(totals).one()
+        db.execute(
+            update(self.model).where(self.model.id.in_(ids)).values(**values),
+            execution_options={"synchronize_session": False}
+        )
+        price_after, tax_after = db.execute(totals).one()
+        self.summaries.apply_delta(
+            db, owner_id, 0, price_after - price_before, tax_after - tax_before
+        )
+        return ids
+
+    def reinstate(self, db: Session, db_obj: Item) -> Item:
+        """
+        Commit an item brought back as a live row (e.g. from the archive),
+        restoring its search entry and summary totals
+        """
+        self.search_index.upsert(db, db_obj)
+        if db_obj.owner_id:
+            self.summaries.apply_delta(
+                db, db_obj.owner_id, 1, db_obj.price or 0.0, db_obj.tax or 0.0
+            )
+        db.commit()
+        db.refresh(db_obj)
+        self.publish_change(db_obj, "item.created")
+        return db_obj
+
+    def publish_bulk_change(self, owner_id: str, ids: List[str]) -> None:
+        """
+        Tell the owner's listeners that a batch of items changed; clients
+        pick up the new values from the change feed
+        """
+        get_broker().publish(item_channel(owner_id), {"type": "items.changed", "ids": ids})
+
+    def publish_change(self, db_obj: Item, event_type: str) -> None:
+        """
+        Push a committed change to the owner's event channel
+        """
+        if db_obj.owner_id:
+            get_broker().publish(
+                item_channel(db_obj.owner_id), self.change_event(db_obj, event_type)
+            )
+
+    def change_event(self, db_obj: Item, event_type: str) -> dict:
+        """
+        Build the event payload for a change, carrying its change feed cursor
+        """
+        return {
+            "type": event_type,
+            "cursor": encode_cursor(db_obj.updated_at, db_obj.id),
+            "item": ItemChange.from_item(db_obj).model_dump(mode="json"),
+        } 
\ No newline at end of file
@@ -0,0 +1,202 @@
+from typing import List, Optional, Tuple, Type
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.models.base import Base
+from app.models.item import Item
+from app.models.item_summary import ItemCompanySummary, ItemOwnerSummary
+from app.models.user import User
+from app.repositories.base import BaseRepository
+
+Totals = Tuple[int, float, float]
+
+class ItemSummaryRepository(BaseRepository[ItemOwnerSummary]):
+    """
+    Repository for ItemOwnerSummary model, and the ItemCompanySummary rows
+    that roll the owner totals up by company
+    """
+    # Relative tolerance for float totals built up from many deltas
+    TOLERANCE = 1e-6
+
+    def __init__(self):
+        super().__init__(ItemOwnerSummary)
+
+    def apply_delta(
+        self, db: Session, owner_id: str, count: int = 0, price: float = 0.0, tax: float = 0.0
+    ) -> None:
+        """
+        Add a change to an owner's totals, and to their company's if they
+        are a live user with one, within the caller's transaction
+        """
+        if not (count or price or tax):
+            return
+        self._add(db, self.model, owner_id, (count, price, tax))
+        # Resolve the company inside the UPDATE; only a missing row costs a lookup
+        company_query = select(User.company).where(
+            User.id == owner_id, User.deleted_at.is_(None)
+        )
+        statement = self._add_statement(
+            ItemCompanySummary, company_query.scalar_subquery(), (count, price, tax)
+        )
+        if db.execute(statement).rowcount:
+            return
+        company = db.execute(company_query).scalar()
+        if company:
+            self._add(db, ItemCompanySummary, company, (count, price, tax))
+
+    def move_owner(
+        self, db: Session, owner_id: str, old_company: Optional[str], new_company: Optional[str]
+    ) -> None:
+        """
+        Move an owner's totals from one company's to another's, within the
+        caller's transaction; either company may be None, e.g. when a user
+        joins their first company or is deleted
+        """
+        if old_company == new_company:
+            return
+        totals = self.get_for_owner(db, owner_id)
+        if not any(totals):
+            return
+        if old_company:
+            self._add(db, ItemCompanySummary, old_company, tuple(-total for total in totals))
+        if new_company:
+            self._add(db, ItemCompanySummary, new_company, totals)
+
+    def _add_statement(self, model: Type[Base], key, totals: Totals):
+        count, price, tax = totals
+        return update(model).where(model.id == key).values(
+            item_count=model.item_count + count,
+            price_total=model.price_total + price,
+            tax_total=model.tax_total + tax,
+        )
+
+    def _add(self, db: Session, model: Type[Base], key: str, totals: Totals) -> None:
+        """
+        Add to the totals in one summary row, creating it if need be
+        """
+        statement = self._add_statement(model, key, totals)
+        if db.execute(statement).rowcount:
+            return
+        count, price, tax = totals
+        try:
+            with db.begin_nested():
+                db.add(model(id=key, item_count=count, price_total=price, tax_total=tax))
+        except IntegrityError:
+            # Another transaction created the row first
+            db.execute(statement)
+
+    def get_for_owner(self, db: Session, owner_id: str) -> Totals:
+        """
+        Get an owner's (item_count, price_total, tax_total)
+        """
+        summary = db.get(self.model, owner_id)
+        if not summary:
+            return 0, 0.0, 0.0
+        return summary.item_count, summary.price_total, summary.tax_total
+
+    def get_for_company(self, db: Session, company: str) -> Totals:
+        """
+        Get the totals across every live user of a company
+        """
+        summary = db.get(ItemCompanySummary, company)
+        if not summary:
+            return 0, 0.0, 0.0
+        return summary.item_count, summary.price_total, summary.tax_total
+
+    def compute(self, db: Session, owner_id: Optional[str] = None) -> dict:
+        """
+        Compute totals from the live items, keyed by owner
+        """
+        query = db.query(
+            Item.owner_id,
+            func.count(Item.id),
+            func.coalesce(func.sum(Item.price), 0.0),
+            func.coalesce(func.sum(Item.tax), 0.0),
+        ).filter(Item.owner_id.isnot(None), Item.deleted_at.is_(None))
+        if owner_id:
+            query = query.filter(Item.owner_id == owner_id)
+        return {
+            owner: (count, price, tax)
+            for owner, count, price, tax in query.group_by(Item.owner_id)
+        }
+
+    def compute_companies(self, db: Session, company: Optional[str] = None) -> dict:
+        """
+        Compute totals from the live items of live users, keyed by company
+        """
+        query = db.query(
+            User.company,
+            func.count(Item.id),
+            func.coalesce(func.sum(Item.price), 0.0),
+            func.coalesce(func.sum(Item.tax), 0.0),
+        ).join(User, User.id == Item.owner_id).filter(
+            Item.deleted_at.is_(None),
+            User.deleted_at.is_(None),
+            User.company.isnot(None)
+        )
+        if company:
+            query = query.filter(User.company == company)
+        return {
+            name: (count, price, tax)
+            for name, count, price, tax in query.group_by(User.company)
+        }
+
+    def rebuild(self, db: Session, owner_id: Optional[str] = None) -> int:
+        """
+        Recompute summaries from the items table, for one owner (and their
+        company) or all of them, and return the number of owner summaries
+        written
+        """
+        actual = self.compute(db, owner_id)
+        self._replace(db, self.model, owner_id, actual)
+        if owner_id:
+            company = db.execute(
+                select(User.company).where(User.id == owner_id, User.deleted_at.is_(None))
+            ).scalar()
+            if company:
+                self._replace(
+                    db, ItemCompanySummary, company, self.compute_companies(db, company)
+                )
+        else:
+            self._replace(db, ItemCompanySummary, None, self.compute_companies(db))
+        db.commit()
+        return len(actual)
+
+    def _replace(self, db: Session, model: Type[Base], key: Optional[str], totals: dict) -> None:
+        """
+        Replace the summary row for key, or every row when key is None
+        """
+        stale = db.query(model)
+        if key:
+            stale = stale.filter(model.id == key)
+        stale.delete()
+        db.add_all(
+            model(id=row_id, item_count=count, price_total=price, tax_total=tax)
+            for row_id, (count, price, tax) in totals.items()
+        )
+
+    def check_consistency(self, db: Session) -> List[Tuple[str, Totals, Totals]]:
+        """
+        Compare stored summaries with the items table, returning
+        (key, stored, actual) for every summary that disagrees, keyed by
+        owner ID or by "company:<name>"
+        """
+        mismatches = []
+        for model, actual, prefix in (
+            (self.model, self.compute(db), ""),
+            (ItemCompanySummary, self.compute_companies(db), "company:"),
+        ):
+            stored = {
+                summary.id: (summary.item_count, summary.price_total, summary.tax_total)
+                for summary in db.query(model)
+            }
+            for key in sorted(set(actual) | set(stored)):
+                expected = actual.get(key, (0, 0.0, 0.0))
+                found = stored.get(key, (0, 0.0, 0.0))
+                if expected[0] != found[0] or any(
+                    abs(a - b) > self.TOLERANCE * max(1.0, abs(a))
+                    for a, b in zip(expected[1:], found[1:])
+                ):
+                    mismatches.append((prefix + key, found, expected))
+        return mismatches
@@ -0,0 +1,117 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, update
+
+from app.models.repricing_job import RepricingJob
+from app.repositories.base import BaseRepository
+from app.schemas.repricing import RepricingRule
+
+class RepricingJobRepository(BaseRepository[RepricingJob]):
+    """
+    Repository for RepricingJob model
+    """
+    def __init__(self):
+        super().__init__(RepricingJob)
+
+    def create_for_owner(
+        self, db: Session, owner_id: str, rule: RepricingRule, total: int
+    ) -> RepricingJob:
+        """
+        Record a new pending repricing job
+        """
+        db_obj = self.model(
+            id=str(uuid.uuid4()),
+            owner_id=owner_id,
+            rule=rule.model_dump(),
+            status="pending",
+            total=total
+        )
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def get_owned(self, db: Session, id: str, owner_id: str) -> Optional[RepricingJob]:
+        """
+        Get a job by ID, only if it belongs to the given owner
+        """
+        return db.query(self.model).filter(
+            self.model.id == id,
+            self.model.owner_id == owner_id
+        ).first()
+
+    def is_resumable(self, job: RepricingJob) -> bool:
+        """
+        Whether a job can be (re)started: it is not finished, and no live
+        run holds it
+        """
+        if job.status == "completed":
+            return False
+        return job.status != "running" or job.lease_until is None \
+            or job.lease_until < datetime.utcnow()
+
+    def claim(self, db: Session, id: str, lease_seconds: int) -> bool:
+        """
+        Take a job for this run, unless it is finished or another run's
+        lease is still live. Commits; returns whether the job was claimed.
+        """
+        now = datetime.utcnow()
+        result = db.execute(
+            update(self.model).where(
+                self.model.id == id,
+                self.model.status != "completed",
+                or_(
+                    self.model.status != "running",
+                    self.model.lease_until.is_(None),
+                    self.model.lease_until < now
+                )
+            ).values(
+                status="running", error=None, lease_until=now + timedelta(seconds=lease_seconds)
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    def advance(
+        self, db: Session, job: RepricingJob, last_item_id: str, count: int, lease_seconds: int
+    ) -> bool:
+        """
+        Record a finished chunk and renew the lease, within the caller's
+        transaction. Only succeeds if the job's progress is still what this
+        run last saw; otherwise another run has taken the job over and the
+        caller must roll its chunk back.
+        """
+        result = db.execute(
+            update(self.model).where(
+                self.model.id == job.id,
+                self.model.status == "running",
+                self.model.processed == job.processed
+            ).values(
+                last_item_id=last_item_id,
+                processed=self.model.processed + count,
+                lease_until=datetime.utcnow() + timedelta(seconds=lease_seconds)
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        return result.rowcount == 1
+
+    def finish(
+        self, db: Session, job: RepricingJob, status: str, error: Optional[str] = None
+    ) -> bool:
+        """
+        Mark a job completed or failed and release its lease, if this run
+        still holds it. Commits.
+        """
+        result = db.execute(
+            update(self.model).where(
+                self.model.id == job.id,
+                self.model.status == "running",
+                self.model.processed == job.processed
+            ).values(status=status, error=error, lease_until=None),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        return result.rowcount == 1
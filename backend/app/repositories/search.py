@@ -0,0 +1,127 @@
+import hashlib
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.item import Item
+
+SEARCH_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(description, '')"
+
+def _fts_rowid(item_id: str) -> int:
+    """
+    Stable FTS rowid for an item; the items table has a string primary key
+    and its implicit rowid may change on VACUUM
+    """
+    digest = hashlib.blake2b(item_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+def _fts5_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match, and the last
+    one may be a prefix so results follow the user as they type
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return ""
+    terms = ['"%s"' % word for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+class ItemSearchIndex:
+    """
+    Full-text index over item name and description.
+
+    Scores are ascending (lower is more relevant) on every dialect so that
+    (score, id) works as a keyset for paging.
+    """
+    def upsert(self, db: Session, item: Item) -> None:
+        """
+        Index or re-index an item within the caller's transaction
+        """
+        if item.id is None:
+            raise ValueError("Item must have an ID before it is indexed")
+        if db.get_bind().dialect.name != "sqlite":
+            return
+        rowid = _fts_rowid(item.id)
+        db.execute(text("DELETE FROM items_fts WHERE rowid = :rowid"), {"rowid": rowid})
+        db.execute(
+            text(
+                "INSERT INTO items_fts (rowid, name, description, item_id) "
+                "VALUES (:rowid, :name, :description, :item_id)"
+            ),
+            {"rowid": rowid, "name": item.name, "description": item.description, "item_id": item.id}
+        )
+
+    def remove(self, db: Session, item_id: str) -> None:
+        """
+        Drop an item from the index within the caller's transaction
+        """
+        if db.get_bind().dialect.name != "sqlite":
+            return
+        db.execute(
+            text("DELETE FROM items_fts WHERE rowid = :rowid"), {"rowid": _fts_rowid(item_id)}
+        )
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Rebuild the index from the live items, e.g. after a backfill
+        """
+        if db.get_bind().dialect.name != "sqlite":
+            return
+        db.execute(text("DELETE FROM items_fts"))
+        for item in db.query(Item).filter(Item.deleted_at.is_(None)).yield_per(1000):
+            self.upsert(db, item)
+        db.commit()
+
+    def search(
+        self,
+        db: Session,
+        owner_id: str,
+        query: str,
+        after: Optional[Tuple[float, str]] = None,
+        limit: int = 20
+    ) -> List[Tuple[str, float]]:
+        """
+        Get (item_id, score) pairs for an owner's live items matching the
+        query, best match first, starting after the (score, id) keyset
+        """
+        dialect = db.get_bind().dialect.name
+        params = {"owner_id": owner_id, "limit": limit}
+        if dialect == "sqlite":
+            params["query"] = _fts5_query(query)
+            if not params["query"]:
+                return []
+            matches = (
+                "SELECT items_fts.item_id AS id, bm25(items_fts) AS score "
+                "FROM items_fts JOIN items ON items.id = items_fts.item_id "
+                "WHERE items_fts MATCH :query"
+            )
+        elif dialect == "postgresql":
+            params["query"] = query
+            matches = (
+                f"SELECT id, -ts_rank(to_tsvector('simple', {SEARCH_DOCUMENT}), "
+                "plainto_tsquery('simple', :query)) AS score FROM items "
+                f"WHERE to_tsvector('simple', {SEARCH_DOCUMENT}) @@ plainto_tsquery('simple', :query)"
+            )
+        else:
+            # No text index on this dialect: unranked substring scan
+            params["query"] = f"%{query}%"
+            matches = (
+                "SELECT id, 0.0 AS score FROM items "
+                f"WHERE {SEARCH_DOCUMENT} LIKE :query"
+            )
+
+        statement = (
+            f"SELECT matches.id, matches.score FROM ({matches} "
+            "AND items.owner_id = :owner_id AND items.deleted_at IS NULL) AS matches"
+        )
+        if after:
+            params["after_score"], params["after_id"] = after
+            statement += (
+                " WHERE matches.score > :after_score"
+                " OR (matches.score = :after_score AND matches.id > :after_id)"
+            )
+        statement += " ORDER BY matches.score, matches.id LIMIT :limit"
+        return [(row.id, row.score) for row in db.execute(text(statement), params)]
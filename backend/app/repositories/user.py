@@ -1,17 +1,22 @@
-from typing import Optional
+from datetime import datetime
+from typing import AbstractSet, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.models.user import User
 from app.repositories.base import BaseRepository
+from app.repositories.item import ItemRepository
 from app.schemas.user import UserCreate, UserUpdate
 
 class UserRepository(BaseRepository[User]):
     """
     Repository for User model
     """
+    read_columns = ("id", "email", "name", "company", "is_active", "picture")
+
     def __init__(self):
         super().__init__(User)
+        self.items = ItemRepository()
 
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
         """
@@ -31,6 +36,31 @@ class UserRepository(BaseRepository[User]):
             self.model.deleted_at.is_(None)
         ).first()
 
+    def read_by_auth0_id(
+        self, db: Session, auth0_id: str, fields: Optional[AbstractSet[str]] = None
+    ) -> Optional[dict]:
+        """
+        Read-only get_by_auth0_id: the user's read_columns plus their live
+        items as compact rows, shaped like the User response schema. With
+        fields, only those columns are selected, and items only if asked for.
+        """
+        row = self.read(db, auth0_id, fields)
+        if row is None:
+            return None
+        user = dict(row._mapping)
+        if fields is None or "items" in fields:
+            user["items"] = self.items.read_by_owner(db, row.id, limit=None)
+        return user
+
+    def get_version(self, db: Session, auth0_id: str) -> Optional[datetime]:
+        """
+        Get only the updated_at of a live user, without loading the row
+        """
+        return db.query(self.model.updated_at).filter(
+            self.model.id == auth0_id,
+            self.model.deleted_at.is_(None)
+        ).scalar()
+
     def create_from_auth0(self, db: Session, auth0_user: dict) -> User:
         """
         Create a new user from Auth0 data
@@ -52,9 +82,33 @@ class UserRepository(BaseRepository[User]):
         """
         db_obj = self.get(db, id)
         if db_obj:
-            update_data = obj_in.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_obj, key, value)
-            db.commit()
-            db.refresh(db_obj)
-        return db_obj 
\ No newline at end of file
+            db_obj = self.update_instance(db, db_obj, obj_in)
+        return db_obj
+
+    def update_instance(self, db: Session, db_obj: User, obj_in: UserUpdate) -> User:
+        """
+        Update a user already loaded in this session, e.g. by
+        get_by_auth0_id, without selecting it again
+        """
+        update_data = obj_in.model_dump(exclude_unset=True)
+        if "company" in update_data and db_obj.deleted_at is None:
+            self.items.summaries.move_owner(
+                db, db_obj.id, db_obj.company, update_data["company"]
+            )
+        for key, value in update_data.items():
+            setattr(db_obj, key, value)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def soft_delete(self, db: Session, id: str) -> bool:
+        """
+        Soft delete a user, taking their items out of their company's totals
+        """
+        db_obj = self.get(db, id)
+        if not db_obj:
+            return False
+        self.items.summaries.move_owner(db, db_obj.id, db_obj.company, None)
+        db_obj.deleted_at = datetime.utcnow()
+        db.commit()
+        return True 
\ No newline at end of file
@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 class ItemBase(BaseModel):
@@ -30,4 +31,95 @@ class Item(ItemBase):
     id: str = Field(..., description="Unique identifier for the item")
     owner_id: Optional[str] = Field(None, description="ID of the item owner")
 
-    model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+ItemSortKey = Literal[
+    "name", "-name", "price", "-price",
+    "created_at", "-created_at", "updated_at", "-updated_at"
+]
+
+class ItemQuery(BaseModel):
+    """
+    Schema for filtering and sorting item listings
+    """
+    price_min: Optional[float] = Field(None, ge=0, description="Minimum price (inclusive)")
+    price_max: Optional[float] = Field(None, ge=0, description="Maximum price (inclusive)")
+    tax_min: Optional[float] = Field(None, ge=0, description="Minimum tax (inclusive)")
+    tax_max: Optional[float] = Field(None, ge=0, description="Maximum tax (inclusive)")
+    name_prefix: Optional[str] = Field(None, min_length=1, description="Case-sensitive name prefix")
+    name_contains: Optional[str] = Field(None, min_length=1, description="Substring of the name")
+    created_after: Optional[datetime] = Field(None, description="Created at or after")
+    created_before: Optional[datetime] = Field(None, description="Created before")
+    updated_after: Optional[datetime] = Field(None, description="Updated at or after")
+    updated_before: Optional[datetime] = Field(None, description="Updated before")
+    sort: Optional[ItemSortKey] = Field(None, description="Sort key, prefixed with - for descending")
+
+class ItemBatchRequest(BaseModel):
+    """
+    Schema for fetching several items by ID
+    """
+    ids: List[str] = Field(..., min_length=1, max_length=1000, description="IDs of the items to fetch")
+
+class ItemBatch(BaseModel):
+    """
+    Schema for a batch of items fetched by ID
+    """
+    items: List[Item] = Field(default_factory=list, description="Found items, in request order")
+    missing: List[str] = Field(default_factory=list, description="Requested IDs that were not found")
+
+class ItemSearchPage(BaseModel):
+    """
+    Schema for a page of full-text search results
+    """
+    items: List[Item] = Field(default_factory=list, description="Matching items, best match first")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+
+class ItemAggregate(BaseModel):
+    """
+    Schema for item totals over an owner or a company
+    """
+    scope: str = Field(..., description="Owner ID or company the totals cover")
+    item_count: int = Field(0, description="Number of live items")
+    price_total: float = Field(0.0, description="Sum of item prices")
+    tax_total: float = Field(0.0, description="Sum of item taxes")
+
+class ItemChange(BaseModel):
+    """
+    Schema for a single entry in the item change feed
+    """
+    id: str = Field(..., description="Unique identifier for the item")
+    owner_id: Optional[str] = Field(None, description="ID of the item owner")
+    name: Optional[str] = Field(None, description="Name of the item")
+    description: Optional[str] = Field(None, description="Optional description of the item")
+    price: Optional[float] = Field(None, description="Price of the item")
+    tax: Optional[float] = Field(None, description="Optional tax amount")
+    created_at: datetime = Field(..., description="When the item was created")
+    updated_at: datetime = Field(..., description="When the item last changed")
+    deleted_at: Optional[datetime] = Field(None, description="Set when the item is a tombstone")
+    deleted: bool = Field(False, description="Whether the item has been deleted")
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @classmethod
+    def from_item(cls, item) -> "ItemChange":
+        """
+        Build a change entry from an item, blanking the payload of tombstones
+        """
+        if item.deleted_at is not None:
+            return cls(
+                id=item.id,
+                owner_id=item.owner_id,
+                created_at=item.created_at,
+                updated_at=item.updated_at,
+                deleted_at=item.deleted_at,
+                deleted=True
+            )
+        return cls.model_validate(item)
+
+class ItemChangeFeed(BaseModel):
+    """
+    Schema for a page of the item change feed
+    """
+    changes: List[ItemChange] = Field(default_factory=list, description="Changes in the order they happened")
+    next_cursor: Optional[str] = Field(None, description="Cursor to pass as `since` on the next poll")
+    has_more: bool = Field(False, description="Whether more changes are available right now")
@@ -0,0 +1,32 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+class RepricingRule(BaseModel):
+    """
+    Schema for a bulk price change and the items it applies to
+    """
+    percent_change: Optional[float] = Field(None, gt=-100, description="Percentage to change prices by")
+    tax_rate: Optional[float] = Field(None, ge=0, description="Set tax to this fraction of the new price")
+    round_to: Optional[float] = Field(None, gt=0, description="Round new prices to a multiple of this amount")
+    name_prefix: Optional[str] = Field(None, min_length=1, description="Only items whose name starts with this")
+    price_min: Optional[float] = Field(None, ge=0, description="Only items priced at least this (before repricing)")
+    price_max: Optional[float] = Field(None, ge=0, description="Only items priced at most this (before repricing)")
+
+    @model_validator(mode="after")
+    def check_change(self) -> "RepricingRule":
+        if self.percent_change is None and self.tax_rate is None:
+            raise ValueError("percent_change or tax_rate is required")
+        return self
+
+class RepricingJob(BaseModel):
+    """
+    Schema for RepricingJob response
+    """
+    id: str = Field(..., description="Unique identifier for the job")
+    status: str = Field(..., description="pending, running, completed or failed")
+    rule: Dict[str, Any] = Field(..., description="The rule being applied")
+    processed: int = Field(0, description="Items repriced so far")
+    total: int = Field(0, description="Items that matched when the job was created")
+    error: Optional[str] = Field(None, description="Why the last run failed")
+
+    model_config = ConfigDict(from_attributes=True)
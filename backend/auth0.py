@@ -1,9 +1,9 @@
 import json
+from functools import lru_cache
 from typing import Dict, List, Optional
 from urllib.request import urlopen
 
 import httpx
-from authlib.integrations.starlette_client import OAuth
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt
@@ -11,17 +11,23 @@ from starlette.requests import Request
 
 from config import settings
 
-# Set up OAuth for Auth0
-oauth = OAuth()
-oauth.register(
-    "auth0",
-    client_id=settings.AUTH0_CLIENT_ID,
-    client_secret=settings.AUTH0_CLIENT_SECRET,
-    client_kwargs={
-        "scope": "openid profile email",
-    },
-    server_metadata_url=f"https://{settings.AUTH0_DOMAIN}/.well-known/openid-configuration",
-)
+# Set up OAuth for Auth0 on first use; authlib is slow to import
+@lru_cache()
+def get_oauth():
+    """Build the Auth0 OAuth client, importing authlib only now"""
+    from authlib.integrations.starlette_client import OAuth  # pylint: disable=import-outside-toplevel
+
+    oauth = OAuth()
+    oauth.register(
+        "auth0",
+        client_id=settings.AUTH0_CLIENT_ID,
+        client_secret=settings.AUTH0_CLIENT_SECRET,
+        client_kwargs={
+            "scope": "openid profile email",
+        },
+        server_metadata_url=f"https://{settings.AUTH0_DOMAIN}/.well-known/openid-configuration",
+    )
+    return oauth
 
 # Set up the Auth0 JWT verifier
 auth0_scheme = HTTPBearer()
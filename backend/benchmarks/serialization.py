@@ -0,0 +1,100 @@
+"""
+Compare response serialization throughput per item endpoint.
+
+    python -m benchmarks.serialization [--rows 100] [--seconds 1.0]
+
+For each endpoint's response shape, times FastAPI's response_model path
+(validate, convert to dicts, render with the default response class)
+against app.core.serialization.json_response, using rows that stand in
+for ORM objects.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from functools import partial
+from types import SimpleNamespace
+from typing import Callable, List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import DefaultJSONResponse, json_response
+from app.schemas.item import Item, ItemBatch, ItemChange, ItemChangeFeed, ItemSearchPage
+
+def _rows(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=f"item-{i:08d}",
+            owner_id="auth0|benchmark",
+            name=f"Item {i}",
+            description="A moderately long description of the item " * 2,
+            price=10.0 + i,
+            tax=1.5,
+            created_at=now,
+            updated_at=now,
+            deleted_at=None
+        )
+        for i in range(count)
+    ]
+
+def _endpoints(rows: list) -> dict:
+    """
+    Map endpoint to (response type, untrusted value, trusted value)
+    """
+    items = [Item.model_validate(row) for row in rows]
+    return {
+        "GET /items": (List[Item], rows, None),
+        "GET /items/search": (
+            ItemSearchPage,
+            {"items": rows, "next_cursor": "x"},
+            ItemSearchPage(items=items, next_cursor="x")
+        ),
+        "GET /items/batch": (ItemBatch, {"items": rows, "missing": []}, ItemBatch(items=items)),
+        "GET /items/changes": (
+            ItemChangeFeed,
+            {"changes": rows, "next_cursor": "x"},
+            ItemChangeFeed(changes=[ItemChange.from_item(row) for row in rows], next_cursor="x")
+        ),
+    }
+
+def _rate(run: Callable[[], None], seconds: float) -> float:
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        run()
+        calls += 1
+    return calls / (time.perf_counter() - started)
+
+def _framework(loop: asyncio.AbstractEventLoop, field, value) -> None:
+    content = loop.run_until_complete(serialize_response(field=field, response_content=value))
+    DefaultJSONResponse(content)
+
+def main(argv=None) -> int:
+    """
+    Print serialization rates per endpoint for each path
+    """
+    parser = argparse.ArgumentParser(description="Benchmark response serialization per endpoint")
+    parser.add_argument("--rows", type=int, default=100, help="Rows per response")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time spent on each measurement")
+    args = parser.parse_args(argv)
+
+    loop = asyncio.new_event_loop()
+    print(f"{args.rows} rows per response, default response class {DefaultJSONResponse.__name__}")
+    print(f"{'endpoint':<20} {'response_model/s':>17} {'json_response/s':>16} {'trusted/s':>10}")
+    for endpoint, (type_, value, trusted_value) in _endpoints(_rows(args.rows)).items():
+        field = create_response_field(name="benchmark", type_=type_)
+        baseline = _rate(partial(_framework, loop, field, value), args.seconds)
+        fast = _rate(partial(json_response, type_, value), args.seconds)
+        trusted = "-"
+        if trusted_value is not None:
+            rate = _rate(partial(json_response, type_, trusted_value, trusted=True), args.seconds)
+            trusted = f"{rate:.0f}"
+        print(f"{endpoint:<20} {baseline:>17.0f} {fast:>16.0f} {trusted:>10}")
+    loop.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Measure cold start per entry point.
+
+    python -m benchmarks.startup [--runs 5] [--top 15]
+
+Each run starts a fresh interpreter with -X importtime, imports the entry
+point's app, and sends it one in-process request. Reports the median
+import time and time to first response (lifespan startup is not run),
+plus the modules with the most import time of their own. Run it from the
+backend directory with the app's environment variables set.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ENTRY_POINTS = {
+    "app.main": ("app.main", "app", "/healthz"),
+    "main (older)": ("main", "app", "/"),
+}
+
+PROBE = """
+import time
+started = time.perf_counter()
+import importlib
+app = getattr(importlib.import_module({module!r}), {attribute!r})
+imported = time.perf_counter()
+import asyncio, json, httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+        return (await client.get({path!r})).status_code
+
+status = asyncio.run(first_request())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (time.perf_counter() - started) * 1000,
+    "status": status,
+}}))
+"""
+
+def _parse_importtime(stderr: str) -> dict:
+    """
+    Map module to its own import time in microseconds
+    """
+    own = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        own[name.strip()] = int(self_us)
+    return own
+
+def measure(module: str, attribute: str, path: str):
+    """
+    Start one fresh interpreter on an entry point and return its timings
+    and per-module import times
+    """
+    probe = PROBE.format(module=module, attribute=attribute, path=path)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True, text=True, cwd=os.getcwd(), check=False
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+        raise RuntimeError(error)
+    return json.loads(result.stdout.strip().splitlines()[-1]), _parse_importtime(result.stderr)
+
+def _collect(module: str, attribute: str, path: str, runs: int):
+    """
+    Measure an entry point over several runs; returns the timings and
+    each module's import time samples
+    """
+    timings = []
+    own = defaultdict(list)
+    for _ in range(runs):
+        timing, modules = measure(module, attribute, path)
+        timings.append(timing)
+        for module_name, self_us in modules.items():
+            own[module_name].append(self_us)
+    return timings, own
+
+def main(argv=None) -> int:
+    """
+    Print cold start timings and the slowest imports per entry point
+    """
+    parser = argparse.ArgumentParser(description="Benchmark cold start per entry point")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args(argv)
+
+    for name, (module, attribute, path) in ENTRY_POINTS.items():
+        try:
+            timings, own = _collect(module, attribute, path, args.runs)
+        except RuntimeError as e:
+            print(f"{name}: could not start: {e}\n")
+            continue
+        import_ms = statistics.median(t["import_ms"] for t in timings)
+        first_ms = statistics.median(t["first_response_ms"] for t in timings)
+        print(f"{name}: import {import_ms:.0f} ms, first response {first_ms:.0f} ms "
+              f"(status {timings[-1]['status']}, median of {args.runs})")
+        slowest = sorted(own.items(), key=lambda entry: -statistics.median(entry[1]))[:args.top]
+        for module_name, samples in slowest:
+            print(f"    {statistics.median(samples) / 1000:8.1f} ms  {module_name}")
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+from typing import List
 from pydantic_settings import BaseSettings
 import os
 from dotenv import load_dotenv
@@ -38,6 +39,16 @@ class Settings(BaseSettings):
     AUTH0_MGMT_CLIENT_ID: str = os.getenv("AUTH0_MGMT_CLIENT_ID", AUTH0_CLIENT_ID)
     AUTH0_MGMT_CLIENT_SECRET: str = os.getenv("AUTH0_MGMT_CLIENT_SECRET", AUTH0_CLIENT_SECRET)
 
+    # In-memory store persistence (empty STORE_DATA_DIR keeps the stores in memory only)
+    STORE_DATA_DIR: str = os.getenv("STORE_DATA_DIR", "")
+    STORE_FSYNC_INTERVAL_MS: int = int(os.getenv("STORE_FSYNC_INTERVAL_MS", "10"))
+    STORE_SNAPSHOT_EVERY: int = int(os.getenv("STORE_SNAPSHOT_EVERY", "10000"))
+
+    # Response compression, negotiated from Accept-Encoding
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "500"))
+    COMPRESSION_CONTENT_TYPES: List[str] = ["application/json", "text/"]
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,14 +1,17 @@
+from typing import Annotated
+
 from fastapi import FastAPI, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.sessions import SessionMiddleware
 
+from app.core.compression import CompressionMiddleware
 from routers import items, users, auth0_login
 from auth0 import get_current_user_from_auth0
 from config import settings
-from typing import Annotated
 from errors import ErrorResponse
+from storage import StorePersistence
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -32,6 +35,14 @@ app.add_middleware(
     max_age=1800,  # 30 minutes session lifetime
 )
 
+# Compress responses the client accepts compressed
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    content_types=settings.COMPRESSION_CONTENT_TYPES,
+    encodings=settings.COMPRESSION_ENCODINGS,
+)
+
 # Exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -55,6 +66,24 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         ).model_dump(),
     )
 
+# Reload the in-memory stores from disk and log their writes
+@app.on_event("startup")
+async def open_stores():
+    if not settings.STORE_DATA_DIR:
+        return
+    for name, store in (("items", items.ITEMS_DB), ("users", users.USERS_DB)):
+        store.attach(StorePersistence(
+            settings.STORE_DATA_DIR,
+            name,
+            fsync_interval=settings.STORE_FSYNC_INTERVAL_MS / 1000,
+            snapshot_every=settings.STORE_SNAPSHOT_EVERY
+        ))
+
+@app.on_event("shutdown")
+async def close_stores():
+    items.ITEMS_DB.close()
+    users.USERS_DB.close()
+
 # Include routers with API prefix
 app.include_router(items.router, prefix=settings.API_PREFIX)
 app.include_router(users.router, prefix=settings.API_PREFIX)
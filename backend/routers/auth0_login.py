@@ -6,7 +6,7 @@ from typing import Dict, Optional
 from urllib.parse import urlencode
 from pydantic import BaseModel
 
-from auth0 import oauth, get_current_user_from_auth0, auth0_management
+from auth0 import get_oauth, get_current_user_from_auth0, auth0_management
 from config import settings
 from schemas import Auth0Token, LoginRequest, Auth0Error, Auth0User, SignupRequest
 
@@ -110,7 +110,7 @@ async def auth0_login_oauth(request: Request):
     Redirect to Auth0 login page
     """
     redirect_uri = settings.AUTH0_CALLBACK_URL
-    return await oauth.auth0.authorize_redirect(request, redirect_uri)
+    return await get_oauth().auth0.authorize_redirect(request, redirect_uri)
 
 
 @router.get("/callback")
@@ -119,8 +119,8 @@ async def auth0_callback(request: Request):
     Auth0 callback handler
     """
     try:
-        token = await oauth.auth0.authorize_access_token(request)
-        user_info = await oauth.auth0.parse_id_token(request, token)
+        token = await get_oauth().auth0.authorize_access_token(request)
+        user_info = await get_oauth().auth0.parse_id_token(request, token)
         
         # Store tokens in session
         request.session["user"] = user_info
@@ -5,6 +5,7 @@ import uuid
 from schemas import Item, ItemBase, ItemCreate
 from errors import ItemNotFoundError, ItemValidator
 from auth import get_current_user
+from storage import InMemoryStore
 
 router = APIRouter(
     prefix="/items",
@@ -16,7 +17,7 @@ router = APIRouter(
 )
 
 # Mock database
-ITEMS_DB = {}
+ITEMS_DB = InMemoryStore()
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=Item)
 async def create_item(
@@ -34,8 +35,7 @@ async def create_item(
     item_id = str(uuid.uuid4())
     item_dict = item.model_dump()
     item_dict.update({"id": item_id})
-    ITEMS_DB[item_id] = item_dict
-    return item_dict
+    return ITEMS_DB.insert(item_id, item_dict)
 
 @router.get("", response_model=List[Item])
 async def read_items(
@@ -43,16 +43,17 @@ async def read_items(
     limit: Annotated[int, Query(ge=1, le=100, description="Max number of items to return")] = 100
 ):
     """Retrieve all items."""
-    return list(ITEMS_DB.values())[skip : skip + limit]
+    return ITEMS_DB.page(skip, limit)
 
 @router.get("/{item_id}", response_model=Item)
 async def read_item(
     item_id: Annotated[str, Path(description="The ID of the item to retrieve")]
 ):
     """Retrieve a specific item by id."""
-    if item_id not in ITEMS_DB:
+    item = ITEMS_DB.get(item_id)
+    if item is None:
         raise ItemNotFoundError(item_id)
-    return ITEMS_DB[item_id]
+    return item
 
 @router.put("/{item_id}", response_model=Item)
 async def update_item(
@@ -73,8 +74,7 @@ async def update_item(
     
     item_dict = item.model_dump()
     item_dict.update({"id": item_id})
-    ITEMS_DB[item_id] = item_dict
-    return item_dict
+    return ITEMS_DB.update(item_id, item_dict)
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_item(
@@ -82,8 +82,6 @@ async def delete_item(
     current_user: Annotated[dict, Depends(get_current_user)] = None
 ):
     """Delete an item."""
-    if item_id not in ITEMS_DB:
+    if not ITEMS_DB.delete(item_id):
         raise ItemNotFoundError(item_id)
-    
-    del ITEMS_DB[item_id]
     return None 
\ No newline at end of file
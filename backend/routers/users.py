@@ -5,6 +5,7 @@ import uuid
 from schemas import User, UserBase, UserCreate
 from auth import get_password_hash, get_current_user, verify_password
 from errors import UserNotFoundError, ValidationError, UserValidator
+from storage import InMemoryStore, UniqueConstraintError
 
 router = APIRouter(
     prefix="/users",
@@ -17,18 +18,17 @@ router = APIRouter(
 )
 
 # Mock database
-USERS_DB = {}
+USERS_DB = InMemoryStore(unique=("email",))
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=User)
 async def create_user(user: UserCreate):
     """Create a new user."""
     # Check if user with email already exists
-    for existing_user in USERS_DB.values():
-        if existing_user["email"] == user.email:
-            raise HTTPException(
-                status_code=400,
-                detail="Email already registered"
-            )
+    if USERS_DB.find("email", user.email) is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
     
     # Additional validation
     try:
@@ -37,7 +37,7 @@ async def create_user(user: UserCreate):
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     
-    user_id = len(USERS_DB) + 1
+    user_id = USERS_DB.next_id()
     hashed_password = get_password_hash(user.password)
     
     user_dict = user.model_dump(exclude={"password"})
@@ -48,7 +48,13 @@ async def create_user(user: UserCreate):
         "items": []
     })
     
-    USERS_DB[user_id] = user_dict
+    try:
+        USERS_DB.insert(user_id, user_dict)
+    except UniqueConstraintError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        ) from exc
     
     # Return without hashed_password
     return {k: v for k, v in user_dict.items() if k != "hashed_password"}
@@ -61,7 +67,7 @@ async def read_users(
 ):
     """Retrieve all users."""
     users = []
-    for user in list(USERS_DB.values())[skip: skip + limit]:
+    for user in USERS_DB.page(skip, limit):
         # Don't return hashed_password
         users.append({k: v for k, v in user.items() if k != "hashed_password"})
     return users
@@ -72,10 +78,10 @@ async def read_user(
     current_user: Annotated[dict, Depends(get_current_user)] = None
 ):
     """Retrieve a specific user by id."""
-    if user_id not in USERS_DB:
+    user = USERS_DB.get(user_id)
+    if user is None:
         raise UserNotFoundError(user_id)
     
-    user = USERS_DB[user_id]
     # Don't return hashed_password
     return {k: v for k, v in user.items() if k != "hashed_password"}
 
@@ -90,12 +96,12 @@ async def update_user(
         raise UserNotFoundError(user_id)
     
     # Check for email uniqueness
-    for uid, existing_user in USERS_DB.items():
-        if existing_user["email"] == user.email and uid != user_id:
-            raise HTTPException(
-                status_code=400,
-                detail="Email already registered"
-            )
+    existing_user = USERS_DB.find("email", user.email)
+    if existing_user is not None and existing_user["id"] != user_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
     
     # Additional validation
     try:
@@ -103,11 +109,15 @@ async def update_user(
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     
-    current_user_data = USERS_DB[user_id]
     update_data = user.model_dump()
     
-    updated_user = {**current_user_data, **update_data}
-    USERS_DB[user_id] = updated_user
+    try:
+        updated_user = USERS_DB.update(user_id, update_data)
+    except UniqueConstraintError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        ) from exc
     
     # Don't return hashed_password
     return {k: v for k, v in updated_user.items() if k != "hashed_password"}
@@ -118,8 +128,6 @@ async def delete_user(
     current_user: Annotated[dict, Depends(get_current_user)] = None
 ):
     """Delete a user."""
-    if user_id not in USERS_DB:
+    if not USERS_DB.delete(user_id):
         raise UserNotFoundError(user_id)
-    
-    del USERS_DB[user_id]
     return None 
\ No newline at end of file
@@ -0,0 +1,364 @@
+"""
+Indexed in-memory tables for the older routers, with optional on-disk
+persistence through a write log and snapshots
+"""
+import bisect
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Log record framing: payload length and CRC32, then the pickled entry
+_RECORD_HEADER = struct.Struct(">II")
+
+
+class UniqueConstraintError(ValueError):
+    """Raised when a write would duplicate a uniquely indexed value"""
+    def __init__(self, field: str, value: Any):
+        super().__init__(f"{field} {value!r} already exists")
+        self.field = field
+        self.value = value
+
+
+class InMemoryStore:
+    """
+    In-memory table of dict rows.
+
+    Rows are found by key or by a unique secondary field through hash
+    indexes, and paged in insertion order through an ordered index, so
+    lookups are O(1) and a page costs O(limit). Writes hold a lock; reads
+    see a consistent row without taking it.
+    """
+
+    def __init__(self, unique: Iterable[str] = ()):
+        self._lock = threading.RLock()
+        self._rows: Dict[Hashable, dict] = {}
+        self._unique: Dict[str, Dict[Any, Hashable]] = {field: {} for field in unique}
+        # Ordered index: insertion sequence numbers (sorted) and their keys
+        self._order_seqs: List[int] = []
+        self._order_keys: List[Hashable] = []
+        self._seq_of: Dict[Hashable, int] = {}
+        self._next_seq = 1
+        self._next_id = 1
+        self._persistence: Optional["StorePersistence"] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def next_id(self) -> int:
+        """Allocate an integer key; never reused, even after deletes"""
+        with self._lock:
+            next_id = self._next_id
+            self._next_id += 1
+            return next_id
+
+    @property
+    def lock(self) -> threading.RLock:
+        """The write lock, for callers that must act between two writes"""
+        return self._lock
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        """Look a row up by key"""
+        return self._rows.get(key)
+
+    def find(self, field: str, value: Any) -> Optional[dict]:
+        """Look a row up by a unique field"""
+        key = self._unique[field].get(value)
+        return None if key is None else self._rows.get(key)
+
+    def page(self, skip: int = 0, limit: int = 100) -> List[dict]:
+        """Rows in insertion order"""
+        with self._lock:
+            keys = self._order_keys[skip:skip + limit]
+            return [self._rows[key] for key in keys]
+
+    def insert(self, key: Hashable, row: dict) -> dict:
+        """Add a row under a new key, at the end of the insertion order"""
+        with self._lock:
+            if key in self._rows:
+                raise KeyError(f"{key!r} already exists")
+            self._check_unique(key, row)
+            self._rows[key] = row
+            self._index(key, row)
+            seq = self._next_seq
+            self._next_seq += 1
+            self._seq_of[key] = seq
+            self._order_seqs.append(seq)
+            self._order_keys.append(key)
+            if isinstance(key, int) and key >= self._next_id:
+                self._next_id = key + 1
+            if self._persistence:
+                self._persistence.append("put", key, row)
+            return row
+
+    def update(self, key: Hashable, changes: dict) -> dict:
+        """Merge changes into an existing row, keeping its position"""
+        with self._lock:
+            current = self._rows[key]
+            row = {**current, **changes}
+            self._check_unique(key, row)
+            self._unindex(current)
+            self._rows[key] = row
+            self._index(key, row)
+            if self._persistence:
+                self._persistence.append("put", key, row)
+            return row
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a row; returns whether it existed"""
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return False
+            self._unindex(row)
+            position = bisect.bisect_left(self._order_seqs, self._seq_of.pop(key))
+            del self._order_seqs[position]
+            del self._order_keys[position]
+            if self._persistence:
+                self._persistence.append("delete", key)
+            return True
+
+    def attach(self, persistence: "StorePersistence") -> None:
+        """Load persisted state into this (empty) store and log every later write"""
+        with self._lock:
+            rows, next_id = persistence.load()
+            for key, row in rows:
+                self.insert(key, row)
+            self._next_id = max(self._next_id, next_id)
+            self._persistence = persistence
+            persistence.bind(self)
+
+    def close(self) -> None:
+        """Flush and detach persistence, if any"""
+        with self._lock:
+            if self._persistence:
+                self._persistence.close()
+                self._persistence = None
+
+    def dump(self) -> Tuple[List[Tuple[Hashable, dict]], int]:
+        """
+        Rows in insertion order and the next free ID; call with the lock
+        held. Writes replace row dicts rather than mutate them, so the
+        returned rows stay valid after the lock is released.
+        """
+        return [(key, self._rows[key]) for key in self._order_keys], self._next_id
+
+    def _check_unique(self, key: Hashable, row: dict) -> None:
+        for field, index in self._unique.items():
+            owner = index.get(row.get(field))
+            if owner is not None and owner != key:
+                raise UniqueConstraintError(field, row.get(field))
+
+    def _index(self, key: Hashable, row: dict) -> None:
+        for field, index in self._unique.items():
+            if row.get(field) is not None:
+                index[row[field]] = key
+
+    def _unindex(self, row: dict) -> None:
+        for field, index in self._unique.items():
+            index.pop(row.get(field), None)
+
+
+class StorePersistence:
+    """
+    Durability for an InMemoryStore: an append-only write log plus
+    periodic compacted snapshots.
+
+    Every write is appended to the log and handed to the OS at once; a
+    background thread fsyncs the log every fsync_interval seconds, so one
+    fsync covers all writes in that window (0 fsyncs every write). After
+    snapshot_every writes the store is snapshotted and the log rotated, so
+    a restart loads one snapshot and replays a short log. Log records and
+    snapshots are both pickled, so rows come back with the same types
+    whichever path restores them, and both are memory-mapped on load.
+    Only one process may open a store's files.
+    """
+
+    def __init__(self, directory: str, name: str, fsync_interval: float = 0.01,
+                 snapshot_every: int = 10000):
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, f"{name}.snapshot")
+        self.log_path = os.path.join(directory, f"{name}.log")
+        self.old_log_path = self.log_path + ".old"
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self._store: Optional[InMemoryStore] = None
+        self._lsn = 0
+        self._since_snapshot = 0
+        self._dirty = threading.Event()
+        self._closed = threading.Event()
+        self._snapshotting = threading.Lock()
+        self._log_lock = threading.Lock()
+        # Held open for the store's lifetime, as the flock lives with it
+        self._lock_file = open(  # pylint: disable=consider-using-with
+            os.path.join(directory, f"{name}.lock"), "w", encoding="utf-8"
+        )
+        if fcntl:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._log = None
+        self._flusher = None
+
+    def load(self) -> Tuple[List[Tuple[Hashable, dict]], int]:
+        """Read the snapshot, then replay newer log entries over it"""
+        rows: Dict[Hashable, dict] = {}
+        next_id = 1
+        if os.path.exists(self.snapshot_path) and os.path.getsize(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as snapshot_file, \
+                    mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                state = pickle.loads(view)
+            self._lsn = state["lsn"]
+            next_id = state["next_id"]
+            rows = dict(state["rows"])
+        for path in (self.old_log_path, self.log_path):
+            valid_end = 0
+            for end, entry in self._read_log(path):
+                valid_end = end
+                # Covered by the snapshot, or copied twice by a rotation
+                # that crashed while appending to the old log
+                if entry["lsn"] <= self._lsn:
+                    continue
+                self._lsn = entry["lsn"]
+                self._since_snapshot += 1
+                if entry["op"] == "delete":
+                    rows.pop(entry["key"], None)
+                else:
+                    rows[entry["key"]] = entry["row"]
+                    # IDs of rows inserted and deleted since the snapshot
+                    # must not be handed out again
+                    if isinstance(entry["key"], int) and entry["key"] >= next_id:
+                        next_id = entry["key"] + 1
+            # Cut off a torn tail, so records appended from now on stay readable
+            if os.path.exists(path) and os.path.getsize(path) > valid_end:
+                os.truncate(path, valid_end)
+        # Stays open for appends until close()
+        self._log = open(self.log_path, "ab")  # pylint: disable=consider-using-with
+        return list(rows.items()), next_id
+
+    def bind(self, store: InMemoryStore) -> None:
+        """Start serving a loaded store: snapshot it and fsync its log in the background"""
+        self._store = store
+        if self.fsync_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def append(self, op: str, key: Hashable, row: Optional[dict] = None) -> None:
+        """Log one write; called with the store lock held, so log order is write order"""
+        self._lsn += 1
+        entry = {"lsn": self._lsn, "op": op, "key": key}
+        if row is not None:
+            entry["row"] = row
+        record = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._log_lock:
+            self._log.write(_RECORD_HEADER.pack(len(record), zlib.crc32(record)) + record)
+            self._log.flush()
+            if self.fsync_interval <= 0:
+                os.fsync(self._log.fileno())
+        self._dirty.set()
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every and not self._snapshotting.locked():
+            threading.Thread(target=self.snapshot, daemon=True).start()
+
+    def snapshot(self) -> None:
+        """Write a compacted snapshot of the store and drop the log it replaces"""
+        # A non-blocking acquire has no with form; released in the finally
+        if not self._snapshotting.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return
+        try:
+            # Only the row list is copied under the store lock; writes
+            # continue while it is pickled
+            with self._store.lock:
+                rows, next_id = self._store.dump()
+                lsn = self._lsn
+                # Later writes go to a fresh log; the current one is only
+                # needed until the snapshot is durable
+                with self._log_lock:
+                    self._sync_log()
+                    self._log.close()
+                    self._rotate_log()
+                    self._log = open(  # pylint: disable=consider-using-with
+                        self.log_path, "ab"
+                    )
+                self._since_snapshot = 0
+            state = pickle.dumps(
+                {"lsn": lsn, "next_id": next_id, "rows": rows},
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+            self._write_snapshot(state)
+            os.remove(self.old_log_path)
+        finally:
+            self._snapshotting.release()
+
+    def _rotate_log(self) -> None:
+        """
+        Move the log aside as the old log. If an earlier snapshot failed,
+        the old log is still all that holds its writes, so the current log
+        is appended to it rather than replacing it.
+        """
+        if not os.path.exists(self.old_log_path):
+            os.replace(self.log_path, self.old_log_path)
+            return
+        with open(self.old_log_path, "ab") as old_log, open(self.log_path, "rb") as log:
+            shutil.copyfileobj(log, old_log)
+            old_log.flush()
+            os.fsync(old_log.fileno())
+        os.remove(self.log_path)
+
+    def _write_snapshot(self, state: bytes) -> None:
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as snapshot_file:
+            snapshot_file.write(state)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def close(self) -> None:
+        """Stop the fsync thread, then sync and close the log"""
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+        with self._log_lock:
+            self._sync_log()
+            self._log.close()
+        self._lock_file.close()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self.fsync_interval):
+            if self._dirty.is_set():
+                self._dirty.clear()
+                with self._log_lock:
+                    self._sync_log()
+
+    def _sync_log(self) -> None:
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    @staticmethod
+    def _read_log(path: str) -> Iterable[Tuple[int, dict]]:
+        """Intact log entries, each with the file offset just past it"""
+        if not os.path.exists(path) or not os.path.getsize(path):
+            return
+        with open(path, "rb") as log_file, \
+                mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            offset = 0
+            while offset + _RECORD_HEADER.size <= len(view):
+                length, checksum = _RECORD_HEADER.unpack_from(view, offset)
+                start = offset + _RECORD_HEADER.size
+                record = view[start:start + length]
+                if len(record) < length or zlib.crc32(record) != checksum:
+                    # A torn final write from a crash; nothing after it was acknowledged
+                    return
+                offset = start + length
+                yield offset, pickle.loads(record)
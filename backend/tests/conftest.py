@@ -0,0 +1,115 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Settings the app requires; tests never talk to a real database or Auth0
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("AUTH0_DOMAIN", "tenant.example.com")
+os.environ.setdefault("AUTH0_CLIENT_ID", "client-id")
+os.environ.setdefault("AUTH0_CLIENT_SECRET", "client-secret")
+os.environ.setdefault("AUTH0_AUDIENCE", "https://api.example.com")
+os.environ.setdefault("WARMUP_ENABLED", "false")
+os.environ.setdefault("LOOP_MONITOR_ENABLED", "false")
+os.environ.setdefault("SERVER_TIMING_SAMPLE_RATE", "0")
+
+# The settings above must be in place before app modules are imported;
+# the model imports register every table on Base.metadata
+# pylint: disable=wrong-import-position,unused-import
+from app.models.base import Base
+import app.models.archived_row
+import app.models.item
+import app.models.item_summary
+import app.models.repricing_job
+import app.models.user
+# pylint: enable=wrong-import-position,unused-import
+
+
+@pytest.fixture
+def engine():
+    """
+    In-memory SQLite with foreign keys enforced, as PostgreSQL does
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def current_user():
+    """
+    Claims of the caller the API clients authenticate as
+    """
+    return {"sub": "auth0|alice"}
+
+
+@pytest.fixture
+def items_client(engine, current_user):
+    """
+    Client for the items router, on the test database and signed in as
+    current_user
+    """
+    # pylint: disable=import-outside-toplevel
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.v1.endpoints import items
+    from app.core.auth.auth0 import get_current_active_user
+    from app.core.database import get_db
+
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def get_test_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    application = FastAPI()
+    application.include_router(items.router, prefix="/items")
+    application.dependency_overrides[get_db] = get_test_db
+    application.dependency_overrides[get_current_active_user] = lambda: current_user
+    return TestClient(application)
+
+
+@pytest.fixture
+def admin_client(current_user):
+    """
+    Client for the admin router, signed in as current_user holding the
+    ADMIN_PERMISSIONS
+    """
+    # pylint: disable=import-outside-toplevel
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.v1.endpoints import admin
+    from app.core.auth.auth0 import get_current_user
+    from app.core.config import settings
+
+    application = FastAPI()
+    application.include_router(admin.router, prefix="/admin")
+    application.dependency_overrides[get_current_user] = lambda: {
+        **current_user, "permissions": list(settings.ADMIN_PERMISSIONS)
+    }
+    return TestClient(application)
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from app.models.archived_row import ArchivedRow
+from app.models.item_summary import ItemOwnerSummary
+from app.models.repricing_job import RepricingJob
+from app.models.user import User
+from app.repositories.archive import ArchiveRepository
+
+archive_repository = ArchiveRepository()
+
+LONG_AGO = datetime.utcnow() - timedelta(days=400)
+CUTOFF = datetime.utcnow() - timedelta(days=90)
+
+
+def add_deleted_user(db, user_id: str) -> User:
+    user = User(id=user_id, email=f"{user_id}@example.com", deleted_at=LONG_AGO)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_archives_user_with_summary_and_jobs_under_foreign_keys(db):
+    add_deleted_user(db, "auth0|gone")
+    db.add(ItemOwnerSummary(id="auth0|gone", item_count=0, price_total=0.0, tax_total=0.0))
+    db.add(RepricingJob(id="job-1", owner_id="auth0|gone", rule={"percent": 5}, status="completed"))
+    db.commit()
+
+    assert archive_repository.archive_batch(db, User, CUTOFF, 100) == 1
+
+    assert db.get(User, "auth0|gone") is None
+    assert db.get(ItemOwnerSummary, "auth0|gone") is None
+    assert db.get(RepricingJob, "job-1") is None
+    archived = {row.table_name for row in db.query(ArchivedRow)}
+    assert archived == {"users", "repricing_jobs"}
+
+
+def test_restore_brings_back_a_live_user(db):
+    add_deleted_user(db, "auth0|back")
+    archive_repository.archive_batch(db, User, CUTOFF, 100)
+
+    restored = archive_repository.restore(db, User, "auth0|back")
+    db.commit()
+
+    assert restored.deleted_at is None
+    assert db.get(User, "auth0|back").email == "auth0|back@example.com"
+    assert db.query(ArchivedRow).count() == 0
+
+
+def test_recently_deleted_users_stay(db):
+    user = User(id="auth0|recent", email="recent@example.com", deleted_at=datetime.utcnow())
+    db.add(user)
+    db.commit()
+
+    assert archive_repository.archive_batch(db, User, CUTOFF, 100) == 0
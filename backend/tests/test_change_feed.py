@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.item import Item
+from app.models.user import User
+
+
+def test_cursor_round_trips_datetimes_and_ids():
+    updated_at = datetime(2024, 1, 2, 3, 4, 5, 678901)
+    cursor = encode_cursor(updated_at, "item-1")
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [updated_at, "item-1"]
+    assert decode_cursor(None, 2) is None
+
+
+@pytest.mark.parametrize(
+    "cursor", ["not a cursor", encode_cursor("only one"), encode_cursor({"x": 1}, "a")]
+)
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, 2)
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+def changed_items(db):
+    """
+    Five items, the first three changed at the same instant so that only
+    the id breaks the tie
+    """
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    base = datetime.utcnow() - timedelta(minutes=10)
+    times = [base, base, base, base + timedelta(minutes=1), base + timedelta(minutes=2)]
+    db.add_all([
+        Item(id=f"item-{n}", name=f"Item {n}", price=1.0, owner_id="auth0|alice",
+             created_at=at, updated_at=at)
+        for n, at in enumerate(times)
+    ])
+    db.commit()
+    return [f"item-{n}" for n in range(5)]
+
+
+def test_change_feed_pages_through_ties_without_gaps(items_client, changed_items):
+    seen, since = [], None
+    while True:
+        params = {"limit": 2, **({"since": since} if since else {})}
+        page = items_client.get("/items/changes", params=params).json()
+        seen += [change["id"] for change in page["changes"]]
+        since = page["next_cursor"]
+        if not page["has_more"]:
+            break
+    assert seen == changed_items
+
+    # Polling again from the last cursor returns nothing new
+    page = items_client.get("/items/changes", params={"since": since}).json()
+    assert page == {"changes": [], "next_cursor": since, "has_more": False}
+
+
+def test_change_feed_returns_tombstones(db, items_client, changed_items):
+    since = items_client.get("/items/changes").json()["next_cursor"]
+    item = db.get(Item, "item-2")
+    item.deleted_at = item.updated_at = datetime.utcnow()
+    db.commit()
+
+    changes = items_client.get("/items/changes", params={"since": since}).json()["changes"]
+    assert [(change["id"], change["deleted"], change["name"]) for change in changes] == [
+        ("item-2", True, None)
+    ]
+
+
+def test_expired_change_feed_cursor_is_gone(items_client):
+    since = encode_cursor(datetime.utcnow() - timedelta(days=3650), "")
+    assert items_client.get("/items/changes", params={"since": since}).status_code == 410
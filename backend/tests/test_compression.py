@@ -0,0 +1,109 @@
+import asyncio
+import gzip
+import zlib
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+from app.core.etag import not_modified
+
+BODY = b'{"items": [' + b", ".join([b'{"name": "Desk lamp"}'] * 100) + b"]}"
+ETAG = '"0123456789abcdef"'
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/large")
+    def large():
+        return Response(BODY, media_type="application/json", headers={"ETag": ETAG})
+
+    @app.get("/small")
+    def small():
+        return Response(b"{}", media_type="application/json")
+
+    @app.get("/cached")
+    def cached():
+        return not_modified(ETAG)
+
+    app.add_middleware(CompressionMiddleware, encodings=("gzip",))
+    return TestClient(app)
+
+
+def test_negotiation_honours_preference_and_q_values():
+    assert negotiate_encoding("gzip, br", ("gzip",)) == "gzip"
+    assert negotiate_encoding("gzip;q=0", ("gzip",)) is None
+    assert negotiate_encoding("*;q=0.5", ("gzip",)) == "gzip"
+    assert negotiate_encoding("*, gzip;q=0", ("gzip",)) is None
+    assert negotiate_encoding("identity", ("gzip",)) is None
+    assert negotiate_encoding(None, ("gzip",)) is None
+
+
+def test_large_bodies_are_compressed_and_etags_weakened():
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == "W/" + ETAG
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == BODY
+
+
+def test_refused_encoding_leaves_body_and_etag_alone():
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == ETAG
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_small_bodies_are_sent_as_is():
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == b"{}"
+
+
+def test_not_modified_varies_on_accept_encoding():
+    response = make_client().get("/cached", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 304
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_streamed_events_are_flushed_one_by_one():
+    events = [b"data: one\n\n", b"data: two\n\n"]
+
+    async def stream(scope, receive, send):
+        await send({
+            "type": "http.response.start", "status": 200,
+            "headers": [(b"content-type", b"text/event-stream")],
+        })
+        for event in events:
+            await send({"type": "http.response.body", "body": event, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def collect(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    middleware = CompressionMiddleware(stream, content_types=("text/event-stream",), encodings=("gzip",))
+    asyncio.run(middleware(scope, receive, collect))
+
+    start, *bodies = sent
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    # Each chunk decompresses to its event without waiting for the next
+    decompressor = zlib.decompressobj(31)
+    assert [decompressor.decompress(body["body"]) for body in bodies[:2]] == events
+    assert gzip.decompress(b"".join(body["body"] for body in bodies)) == b"".join(events)
+
+
+def test_legacy_entry_point_negotiates_encodings():
+    import main  # pylint: disable=import-outside-toplevel
+
+    client = TestClient(main.app)
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    refused = client.get("/openapi.json", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware
+from app.core.etag import etag_matches, make_etag
+from app.models.user import User
+
+
+def test_make_etag_is_stable_and_weak():
+    assert make_etag("item", 1) == make_etag("item", 1)
+    assert make_etag("item", 1) != make_etag("item", 2)
+    assert make_etag("item", 1).startswith('W/"')
+
+
+def test_weak_comparison_ignores_weakness():
+    etag = make_etag("item", 1).removeprefix("W/")
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches(etag, "W/" + etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_strong_comparison_never_matches_weak_etags():
+    etag = '"0123456789abcdef"'
+    assert etag_matches(f'"other", {etag}', etag, strong=True)
+    assert etag_matches("*", etag, strong=True)
+    assert not etag_matches("W/" + etag, etag, strong=True)
+    assert not etag_matches(etag, "W/" + etag, strong=True)
+
+
+def create_item(db, items_client, description=None):
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    db.commit()
+    return items_client.post(
+        "/items/", json={"name": "Desk lamp", "description": description, "price": 20.0}
+    )
+
+
+def test_read_item_revalidates_with_if_none_match(db, items_client):
+    created = create_item(db, items_client)
+    item_id, etag = created.json()["id"], created.headers["etag"]
+
+    fetched = items_client.get(f"/items/{item_id}")
+    assert fetched.headers["etag"] == etag
+    not_modified = items_client.get(f"/items/{item_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+    assert items_client.get(f"/items/{item_id}", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_update_item_checks_if_match(db, items_client):
+    created = create_item(db, items_client)
+    item_id, etag = created.json()["id"], created.headers["etag"]
+    url = f"/items/{item_id}"
+
+    assert items_client.put(url, json={"price": 30.0}, headers={"If-Match": '"stale"'}).status_code == 412
+    updated = items_client.put(url, json={"price": 30.0}, headers={"If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["etag"] != etag
+    # The first ETag is stale now
+    assert items_client.put(url, json={"price": 40.0}, headers={"If-Match": etag}).status_code == 412
+    assert items_client.get(url).json()["price"] == 30.0
+
+
+def test_list_items_revalidates_with_if_none_match(db, items_client):
+    create_item(db, items_client)
+    etag = items_client.get("/items/").headers["etag"]
+
+    assert items_client.get("/items/", headers={"If-None-Match": etag}).status_code == 304
+    items_client.post("/items/", json={"name": "Chair", "price": 50.0})
+    assert items_client.get("/items/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_if_match_accepts_the_etag_of_a_compressed_read(db, items_client):
+    client = TestClient(CompressionMiddleware(items_client.app, encodings=("gzip",)))
+    item_id = create_item(db, client, description="Brass, adjustable arm. " * 40).json()["id"]
+
+    fetched = client.get(f"/items/{item_id}", headers={"Accept-Encoding": "gzip"})
+    assert fetched.headers["content-encoding"] == "gzip"
+
+    updated = client.put(
+        f"/items/{item_id}", json={"price": 30.0}, headers={"If-Match": fetched.headers["etag"]}
+    )
+    assert updated.status_code == 200
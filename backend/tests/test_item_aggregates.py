@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from app.models.user import User
+from app.repositories.item import ItemRepository
+from app.schemas.item import ItemCreate
+
+items = ItemRepository()
+
+
+def test_company_aggregates_404_without_company(db, items_client):
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    db.commit()
+
+    response = items_client.get("/items/aggregates/company")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Current user has no company"}
+
+
+def test_company_aggregates_404_for_unknown_user(items_client):
+    assert items_client.get("/items/aggregates/company").status_code == 404
+
+
+def test_company_aggregates_sum_live_users(db, items_client):
+    db.add_all([
+        User(id="auth0|alice", email="alice@example.com", company="acme"),
+        User(id="auth0|bob", email="bob@example.com", company="acme"),
+        User(id="auth0|gone", email="gone@example.com", company="acme", deleted_at=datetime.utcnow()),
+    ])
+    db.commit()
+    for owner_id, price in (("auth0|alice", 4.0), ("auth0|alice", 6.0), ("auth0|bob", 5.0),
+                            ("auth0|gone", 70.0)):
+        items.create_with_owner(db, ItemCreate(name="Lamp", price=price), owner_id)
+
+    body = items_client.get("/items/aggregates/company").json()
+
+    assert (body["scope"], body["item_count"], body["price_total"]) == ("acme", 3, 15.0)
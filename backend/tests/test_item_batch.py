@@ -0,0 +1,64 @@
+import pytest
+
+from app.models.user import User
+from app.repositories.item import ItemRepository
+from app.schemas.item import ItemCreate
+
+items = ItemRepository()
+
+
+@pytest.fixture
+def item_ids(db, items_client):
+    """
+    IDs of three of alice's items, and one of bob's
+    """
+    db.add_all([
+        User(id="auth0|alice", email="alice@example.com"),
+        User(id="auth0|bob", email="bob@example.com"),
+    ])
+    db.commit()
+    ids = [
+        items_client.post("/items/", json={"name": name, "price": 10.0}).json()["id"]
+        for name in ("Lamp", "Desk", "Chair")
+    ]
+    bobs = items.create_with_owner(db, ItemCreate(name="Bike", price=99.0), "auth0|bob")
+    return ids, bobs.id
+
+
+def test_get_batch_keeps_request_order_and_reports_missing(items_client, item_ids):
+    (lamp, desk, chair), bobs = item_ids
+
+    response = items_client.get(
+        "/items/batch", params={"ids": [chair, "nope", lamp, bobs, chair]}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [chair, lamp]
+    # Someone else's item is indistinguishable from a missing one
+    assert body["missing"] == ["nope", bobs]
+    assert desk not in [item["id"] for item in body["items"]]
+
+
+def test_post_batch_matches_get(items_client, item_ids):
+    (lamp, desk, _), _ = item_ids
+    ids = [desk, "nope", lamp]
+
+    posted = items_client.post("/items/batch", json={"ids": ids})
+
+    assert posted.status_code == 200
+    assert posted.json() == items_client.get("/items/batch", params={"ids": ids}).json()
+
+
+def test_batch_honours_sparse_fields(items_client, item_ids):
+    (lamp, _, _), _ = item_ids
+
+    body = items_client.get("/items/batch", params={"ids": [lamp], "fields": "id,name"}).json()
+
+    assert body == {"items": [{"id": lamp, "name": "Lamp"}], "missing": []}
+
+
+def test_batch_rejects_empty_and_oversized_id_lists(items_client):
+    assert items_client.post("/items/batch", json={"ids": []}).status_code == 422
+    too_many = [f"id-{n}" for n in range(101)]
+    assert items_client.get("/items/batch", params={"ids": too_many}).status_code == 422
@@ -0,0 +1,53 @@
+import pytest
+
+from app.core.config import get_settings
+from app.models.user import User
+
+PRICES = {"Lamp": 20.0, "Desk": 150.0, "Chair": 80.0, "Dresser": 300.0}
+
+
+@pytest.fixture
+def listed(db, items_client):
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    db.commit()
+    for name, price in PRICES.items():
+        items_client.post("/items/", json={"name": name, "price": price, "tax": price / 10})
+
+
+def names(response) -> list:
+    assert response.status_code == 200, response.text
+    return [item["name"] for item in response.json()]
+
+
+def test_filters_by_price_range_and_name_prefix(items_client, listed):
+    in_range = items_client.get("/items/", params={"price_min": 80, "price_max": 150})
+    assert sorted(names(in_range)) == ["Chair", "Desk"]
+    by_prefix = items_client.get("/items/", params={"name_prefix": "D", "sort": "name"})
+    assert names(by_prefix) == ["Desk", "Dresser"]
+
+
+def test_sorts_both_ways_and_pages(items_client, listed):
+    assert names(items_client.get("/items/", params={"sort": "-price"})) == [
+        "Dresser", "Desk", "Chair", "Lamp"
+    ]
+    page = items_client.get("/items/", params={"sort": "price", "skip": 1, "limit": 2})
+    assert names(page) == ["Chair", "Desk"]
+
+
+@pytest.mark.parametrize("params", [
+    {"limit": 0}, {"limit": -1}, {"limit": 501}, {"skip": -1}, {"sort": "tax"}
+])
+def test_rejects_out_of_range_paging_and_unknown_sort_keys(items_client, params):
+    assert items_client.get("/items/", params=params).status_code == 422
+
+
+def test_refuses_unindexed_queries_over_the_scan_limit(items_client, listed, monkeypatch):
+    params = {"name_contains": "es", "sort": "price"}
+    assert names(items_client.get("/items/", params=params)) == ["Desk", "Dresser"]
+
+    monkeypatch.setattr(get_settings(), "ITEM_QUERY_SCAN_LIMIT", 3)
+    refused = items_client.get("/items/", params=params)
+    assert refused.status_code == 400
+    assert "too many items" in refused.json()["detail"]
+    # One indexed column stays allowed whatever the owner's size
+    assert names(items_client.get("/items/", params={"sort": "price", "limit": 1})) == ["Lamp"]
@@ -0,0 +1,79 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.v1.endpoints import items
+from app.core.events import get_broker, item_channel
+from app.core.pagination import encode_cursor
+from app.models.user import User
+from app.schemas.item import ItemCreate, ItemUpdate
+
+OWNER = "auth0|alice"
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def open_stream(db, last_event_id):
+    """
+    Open the stream and collect the replayed backlog frames
+    """
+    async def run():
+        response = await items.stream_item_changes(
+            ConnectedRequest(), last_event_id, db, {"sub": OWNER}
+        )
+        frames = []
+        async for frame in response.body_iterator:
+            if frame.startswith(":"):
+                break
+            frames.append(frame)
+            if '"resync"' in frame or len(frames) == 3:
+                break
+        await response.body_iterator.aclose()
+        return frames
+
+    return asyncio.run(run())
+
+
+def event_types(frames):
+    return [json.loads(frame.split("data: ", 1)[1])["type"] for frame in frames]
+
+
+@pytest.fixture
+def owner(db):
+    db.add(User(id=OWNER, email="alice@example.com"))
+    db.commit()
+
+
+def test_replay_tells_creates_updates_and_deletes_apart(db, owner):
+    since = encode_cursor(datetime.utcnow() - timedelta(hours=1), "")
+    repository = items.item_repository
+    repository.create_with_owner(db, ItemCreate(name="Lamp", price=20.0), OWNER)
+    chair = repository.create_with_owner(db, ItemCreate(name="Chair", price=50.0), OWNER)
+    desk = repository.create_with_owner(db, ItemCreate(name="Desk", price=90.0), OWNER)
+    repository.update_instance(db, chair, ItemUpdate(price=45.0))
+    repository.soft_delete_instance(db, desk)
+
+    assert event_types(open_stream(db, since)) == ["item.created", "item.updated", "item.deleted"]
+    # Closing the stream released its subscription
+    assert item_channel(OWNER) not in get_broker()._subscriptions
+
+
+def test_expired_cursor_asks_for_a_resync(db, owner):
+    since = encode_cursor(datetime.utcnow() - timedelta(days=3650), "")
+    assert event_types(open_stream(db, since)) == ["resync"]
+
+
+def test_failed_replay_drops_the_subscription(db, owner, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("database gone")
+
+    monkeypatch.setattr(items.item_repository, "get_changes", fail)
+    since = encode_cursor(datetime.utcnow() - timedelta(hours=1), "")
+    with pytest.raises(RuntimeError):
+        open_stream(db, since)
+    assert item_channel(OWNER) not in get_broker()._subscriptions
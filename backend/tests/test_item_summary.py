@@ -0,0 +1,106 @@
+import pytest
+
+from app.models.item_summary import ItemCompanySummary, ItemOwnerSummary
+from app.models.user import User
+from app.repositories.item import ItemRepository
+from app.repositories.user import UserRepository
+from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.repricing import RepricingRule
+from app.schemas.user import UserUpdate
+
+items = ItemRepository()
+users = UserRepository()
+OWNER = "auth0|alice"
+
+
+@pytest.fixture
+def owner(db):
+    db.add(User(id=OWNER, email="alice@example.com"))
+    db.commit()
+
+
+def totals(db):
+    db.expire_all()
+    return items.summaries.get_for_owner(db, OWNER)
+
+
+def test_apply_delta_creates_then_adds_to_the_row(db, owner):
+    items.summaries.apply_delta(db, OWNER, 1, 10.0, 1.0)
+    items.summaries.apply_delta(db, OWNER, 2, 5.0)
+    items.summaries.apply_delta(db, OWNER)
+    db.commit()
+    assert totals(db) == (3, 15.0, 1.0)
+    assert db.query(ItemOwnerSummary).count() == 1
+
+
+def test_item_writes_keep_the_summary_in_step(db, owner):
+    lamp = items.create_with_owner(db, ItemCreate(name="Lamp", price=20.0, tax=2.0), OWNER)
+    chair = items.create_with_owner(db, ItemCreate(name="Chair", price=50.0), OWNER)
+    assert totals(db) == (2, 70.0, 2.0)
+
+    items.update_instance(db, chair, ItemUpdate(price=40.0, tax=4.0))
+    assert totals(db) == (2, 60.0, 6.0)
+
+    items.soft_delete_instance(db, lamp)
+    assert totals(db) == (1, 40.0, 4.0)
+
+    items.reprice_chunk(db, OWNER, RepricingRule(percent_change=50), None, 10)
+    db.commit()
+    assert totals(db) == pytest.approx((1, 60.0, 4.0))
+    assert items.summaries.check_consistency(db) == []
+
+
+def test_check_consistency_finds_and_rebuild_repairs_drift(db, owner):
+    items.create_with_owner(db, ItemCreate(name="Lamp", price=20.0), OWNER)
+    items.summaries.apply_delta(db, OWNER, 1, 99.0)
+    db.commit()
+
+    assert [owner_id for owner_id, _, _ in items.summaries.check_consistency(db)] == [OWNER]
+    assert items.summaries.rebuild(db) == 1
+    assert items.summaries.check_consistency(db) == []
+    assert totals(db) == (1, 20.0, 0.0)
+
+
+def company_totals(db, company: str = "acme"):
+    db.expire_all()
+    return items.summaries.get_for_company(db, company)
+
+
+def test_company_summary_follows_item_writes_and_user_changes(db):
+    db.add_all([
+        User(id=OWNER, email="alice@example.com", company="acme"),
+        User(id="auth0|bob", email="bob@example.com", company="acme"),
+        User(id="auth0|solo", email="solo@example.com"),
+    ])
+    db.commit()
+    lamp = items.create_with_owner(db, ItemCreate(name="Lamp", price=20.0, tax=2.0), OWNER)
+    items.create_with_owner(db, ItemCreate(name="Desk", price=80.0), "auth0|bob")
+    items.create_with_owner(db, ItemCreate(name="Pen", price=1.0), "auth0|solo")
+    assert company_totals(db) == (2, 100.0, 2.0)
+
+    items.update_instance(db, lamp, ItemUpdate(price=30.0))
+    assert company_totals(db) == (2, 110.0, 2.0)
+
+    users.update_instance(db, db.get(User, OWNER), UserUpdate(company="globex"))
+    assert company_totals(db) == (1, 80.0, 0.0)
+    assert company_totals(db, "globex") == (1, 30.0, 2.0)
+
+    users.soft_delete(db, "auth0|bob")
+    assert company_totals(db) == (0, 0.0, 0.0)
+    assert items.summaries.check_consistency(db) == []
+
+
+def test_rebuild_repairs_company_drift(db):
+    db.add(User(id=OWNER, email="alice@example.com", company="acme"))
+    db.commit()
+    items.create_with_owner(db, ItemCreate(name="Lamp", price=20.0), OWNER)
+    db.add(ItemCompanySummary(id="ghost", item_count=3, price_total=9.0, tax_total=0.0))
+    db.get(ItemCompanySummary, "acme").price_total = 99.0
+    db.commit()
+
+    assert [key for key, _, _ in items.summaries.check_consistency(db)] == [
+        "company:acme", "company:ghost"
+    ]
+    items.summaries.rebuild(db)
+    assert items.summaries.check_consistency(db) == []
+    assert company_totals(db) == (1, 20.0, 0.0)
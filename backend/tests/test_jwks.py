@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import json
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+
+from app.core.auth import auth0
+from app.core.config import settings
+
+
+def make_jwk(kid: str):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+    jwk.update(kid=kid, use="sig")
+    return key, jwk
+
+
+def sign(key, kid: str) -> str:
+    claims = {
+        "sub": "auth0|alice",
+        "aud": settings.AUTH0_AUDIENCE,
+        "iss": f"https://{settings.AUTH0_DOMAIN}/",
+        "exp": int(time.time()) + 60,
+    }
+    return jwt.encode(claims, key, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    """
+    The key set Auth0 serves, with a log of the fetches
+    """
+    served = {"keys": [], "fetches": 0}
+
+    async def handler(_request: httpx.Request) -> httpx.Response:
+        served["fetches"] += 1
+        # Let concurrent callers pile up behind the first fetch
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"keys": list(served["keys"])})
+
+    monkeypatch.setattr(
+        auth0.httpx, "AsyncClient",
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    )
+    return served
+
+
+def test_concurrent_misses_share_one_fetch(jwks):
+    handler = auth0.Auth0Handler()
+    jwks["keys"].append(make_jwk("k1")[1])
+
+    async def run():
+        return await asyncio.gather(*(handler.get_jwks() for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert jwks["fetches"] == 1
+    assert all(keys[0]["kid"] == "k1" for keys in results)
+    asyncio.run(handler.get_jwks())
+    assert jwks["fetches"] == 1
+
+
+def test_refresh_is_rate_limited_and_stale_keys_are_refetched(jwks):
+    handler = auth0.Auth0Handler()
+    asyncio.run(handler.get_jwks())
+
+    asyncio.run(handler.get_jwks(refresh=True))
+    assert jwks["fetches"] == 1
+
+    handler._jwks_fetched_at -= settings.JWKS_MIN_REFRESH_SECONDS + 1
+    asyncio.run(handler.get_jwks(refresh=True))
+    assert jwks["fetches"] == 2
+
+    handler._jwks_fetched_at -= settings.JWKS_CACHE_SECONDS + 1
+    asyncio.run(handler.get_jwks())
+    assert jwks["fetches"] == 3
+
+
+def test_verify_token_refetches_after_key_rotation(jwks):
+    handler = auth0.Auth0Handler()
+    old_key, old_jwk = make_jwk("old")
+    jwks["keys"].append(old_jwk)
+    assert asyncio.run(handler.verify_token(sign(old_key, "old")))["sub"] == "auth0|alice"
+
+    new_key, new_jwk = make_jwk("new")
+    jwks["keys"][:] = [new_jwk]
+    handler._jwks_fetched_at -= settings.JWKS_MIN_REFRESH_SECONDS + 1
+    assert asyncio.run(handler.verify_token(sign(new_key, "new")))["sub"] == "auth0|alice"
+    assert jwks["fetches"] == 2
+
+    # A second unknown kid within the refresh interval does not fetch again
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(handler.verify_token(sign(old_key, "unknown")))
+    assert rejected.value.status_code == 401
+    assert jwks["fetches"] == 2
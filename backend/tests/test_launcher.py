@@ -0,0 +1,79 @@
+import argparse
+import os
+import socket
+
+import pytest
+
+from app import launcher
+
+
+class FakeEngine:
+    def __init__(self):
+        self.disposed = []
+
+    def dispose(self, close=True):
+        self.disposed.append(close)
+
+
+class FakeServer:
+    runs = []
+
+    def __init__(self, config):
+        self.config = config
+        self.started = True
+
+    def run(self, sockets):
+        FakeServer.runs.append(sockets)
+
+
+def worker_args():
+    return argparse.Namespace(
+        host="127.0.0.1", port=0, log_level="warning", graceful_timeout=1.0
+    )
+
+
+def test_worker_drops_the_masters_connections_before_serving(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(launcher, "get_engine", lambda: engine)
+    monkeypatch.setattr(launcher.uvicorn, "Server", FakeServer)
+    sock = socket.socket()
+    try:
+        launcher.run_worker(object(), sock, worker_args())
+    finally:
+        sock.close()
+    # Pooled connections are forgotten, not closed: the master still owns them
+    assert engine.disposed == [False]
+    assert FakeServer.runs[-1] == [sock]
+
+
+def run_forked(monkeypatch, run_worker) -> int:
+    monkeypatch.setattr(launcher, "run_worker", run_worker)
+    pid = os.fork()
+    if pid == 0:
+        launcher.worker_process(None, None, worker_args())
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_worker_exit_status(monkeypatch):
+    def crash(*args):
+        raise RuntimeError("boom")
+
+    def startup_failure(*args):
+        raise SystemExit(3)
+
+    assert run_forked(monkeypatch, lambda *args: None) == 0
+    assert run_forked(monkeypatch, crash) == 1
+    assert run_forked(monkeypatch, startup_failure) == 3
+
+
+def test_worker_fails_when_the_app_does_not_start(monkeypatch):
+    class NotStarted(FakeServer):
+        def run(self, sockets):
+            self.started = False
+
+    monkeypatch.setattr(launcher, "get_engine", FakeEngine)
+    monkeypatch.setattr(launcher.uvicorn, "Server", NotStarted)
+    with socket.socket() as sock, pytest.raises(RuntimeError):
+        launcher.run_worker(object(), sock, worker_args())
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+PROBE = """
+import app.api.v1.api
+import app.jobs.repricing
+from app.core.config import get_settings
+print(get_settings.cache_info().currsize)
+"""
+
+
+def test_importing_the_routers_does_not_build_settings():
+    # A bare environment: building Settings here would fail on the
+    # missing required values
+    env = {"PATH": os.environ.get("PATH", "")}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=False
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "0"
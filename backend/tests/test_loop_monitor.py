@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import time
+
+from app.core.loop_monitor import LoopMonitor
+from app.core.metrics import REGISTRY
+
+
+def block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def test_watchdog_logs_the_blocking_stack_once(caplog):
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.loop"):
+        asyncio.run(run())
+
+    stalls = [record.getMessage() for record in caplog.records]
+    assert len(stalls) == 1
+    assert stalls[0].startswith("Event loop blocked for")
+    assert "block_the_loop" in stalls[0]
+    # The late wake-up is recorded as lag
+    assert max(monitor.samples) >= 0.2
+
+
+def test_lag_quantiles_are_exported():
+    monitor = LoopMonitor()
+    assert monitor.quantiles() == {}
+    monitor.samples.extend([0.001] * 98 + [0.5, 1.0])
+
+    assert monitor.quantiles() == {
+        ("0.5",): 0.001, ("0.9",): 0.001, ("0.99",): 1.0, ("1",): 1.0
+    }
+    assert 'event_loop_lag_quantile_seconds{quantile="1"} 1.0' in REGISTRY.render()
@@ -0,0 +1,70 @@
+import pytest
+
+from app.core.auth.auth0 import get_current_user
+from app.core.memory import tracer
+from app.repositories.item import ItemRepository
+
+
+@pytest.fixture
+def tracing(admin_client):
+    assert admin_client.post("/admin/memory/tracing").json()["tracing"] is True
+    yield admin_client
+    tracer.stop()
+
+
+def allocate() -> list:
+    return [bytearray(1024) for _ in range(2000)]
+
+
+def test_snapshots_need_tracing(admin_client):
+    assert admin_client.get("/admin/memory/top").status_code == 409
+    assert admin_client.post("/admin/memory/snapshots").status_code == 409
+
+
+def test_diff_finds_the_growing_site(tracing):
+    snapshot = tracing.post("/admin/memory/snapshots")
+    assert snapshot.status_code == 201
+    snapshot_id = snapshot.json()["id"]
+    assert snapshot.json()["saved"][-1] == snapshot_id
+    kept = allocate()
+
+    sites = tracing.get(f"/admin/memory/snapshots/{snapshot_id}/diff").json()["sites"]
+
+    grown = [site for site in sites if "test_memory_endpoints.py" in site["site"]]
+    assert grown and grown[0]["size_diff_bytes"] >= 1024 * 2000
+    assert len(kept) == 2000
+
+
+def test_top_and_unknown_snapshots(tracing):
+    kept = allocate()
+    top = tracing.get("/admin/memory/top", params={"limit": 5, "group_by": "filename"}).json()
+
+    assert len(top["sites"]) <= 5
+    assert any(site["site"].endswith("test_memory_endpoints.py") for site in top["sites"])
+    assert tracing.get("/admin/memory/snapshots/999/diff").status_code == 404
+    assert tracing.get("/admin/memory/top", params={"group_by": "module"}).status_code == 422
+    assert kept
+
+
+def test_stopping_drops_the_snapshots(tracing):
+    tracing.post("/admin/memory/snapshots")
+
+    assert tracing.delete("/admin/memory/tracing").json()["tracing"] is False
+    assert tracer.snapshot_ids() == []
+
+
+def test_object_counts_cover_our_classes(admin_client):
+    repositories = [ItemRepository() for _ in range(3)]
+
+    objects = admin_client.get("/admin/memory/objects", params={"limit": 500}).json()["objects"]
+
+    counts = {entry["type"]: entry["count"] for entry in objects}
+    assert counts["app.repositories.item.ItemRepository"] >= len(repositories)
+    assert all(name.startswith("app.") for name in counts)
+
+
+def test_memory_endpoints_need_admin_permissions(admin_client):
+    admin_client.app.dependency_overrides[get_current_user] = lambda: {"sub": "auth0|bob"}
+
+    assert admin_client.get("/admin/memory/objects").status_code == 403
+    assert admin_client.post("/admin/memory/tracing").status_code == 403
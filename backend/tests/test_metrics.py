@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.core import metrics
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    histogram = metrics.Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, '/say/"hi"')
+
+    lines = histogram.render()
+
+    assert lines[:2] == ["# HELP demo_seconds Demo", "# TYPE demo_seconds histogram"]
+    assert lines[2:] == [
+        'demo_seconds_bucket{route="/say/\\"hi\\"",le="0.1"} 1',
+        'demo_seconds_bucket{route="/say/\\"hi\\"",le="1.0"} 3',
+        'demo_seconds_bucket{route="/say/\\"hi\\"",le="+Inf"} 4',
+        'demo_seconds_sum{route="/say/\\"hi\\""} 4.05',
+        'demo_seconds_count{route="/say/\\"hi\\""} 4',
+    ]
+
+
+def test_middleware_records_by_route_template():
+    application = FastAPI()
+
+    @application.get("/things/{thing_id}")
+    async def read_thing(thing_id: int):
+        return {"id": thing_id}
+
+    client = TestClient(metrics.MetricsMiddleware(application))
+    before = metrics.http_requests.value("GET", "/things/{thing_id}", "200")
+    assert client.get("/things/1").status_code == 200
+    assert client.get("/things/2").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    assert metrics.http_requests.value("GET", "/things/{thing_id}", "200") == before + 2
+    assert metrics.http_requests.value("GET", "unmatched", "404") >= 1
+    assert 'route="/things/{thing_id}"' in "\n".join(metrics.http_duration.render())
+
+
+def test_engine_statements_and_pool_are_exported():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    metrics.instrument_engine(engine)
+    metrics.register_pool(engine)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        rendered = metrics.REGISTRY.render()
+    engine.dispose()
+
+    assert 'db_query_duration_seconds_count{operation="SELECT"}' in rendered
+    assert 'db_pool_connections{state="checked_out"} 1' in rendered
+    assert 'db_pool_connections{state="size"} 2' in rendered
+
+
+def test_track_upstream_counts_failures():
+    before = metrics.auth0_errors.value("demo")
+    with metrics.track_upstream("demo"):
+        pass
+    with pytest.raises(ConnectionError):
+        with metrics.track_upstream("demo"):
+            raise ConnectionError("down")
+
+    assert metrics.auth0_errors.value("demo") == before + 1
+    assert 'operation="demo"' in "\n".join(metrics.auth0_duration.render())
+
+
+def test_metrics_endpoint_serves_the_text_format():
+    from app.main import app  # pylint: disable=import-outside-toplevel
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert "# TYPE http_requests_total counter" in response.text
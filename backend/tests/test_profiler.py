@@ -0,0 +1,82 @@
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.auth.auth0 import get_current_user
+from app.core.profiler import ProfileTriggerMiddleware, profiler
+
+
+def spin(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def profile_in_background(seconds: float, triggered: bool = False) -> dict:
+    result = {}
+    thread = threading.Thread(
+        target=lambda: result.update(stacks=profiler.run(seconds, 0.002, triggered))
+    )
+    thread.start()
+    result["thread"] = thread
+    return result
+
+
+def test_profile_collapses_sampled_stacks():
+    profile = profile_in_background(0.2)
+    spin(0.3)
+    profile["thread"].join()
+
+    lines = profile["stacks"].splitlines()
+    ours = [line for line in lines if "spin (" in line]
+    assert ours
+    stack, count = ours[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;") and int(count) > 0
+
+
+def test_triggered_profile_keeps_only_marked_requests():
+    application = FastAPI()
+
+    @application.get("/marked")
+    async def marked():
+        spin(0.15)
+
+    @application.get("/unmarked")
+    async def unmarked():
+        spin(0.15)
+
+    client = TestClient(ProfileTriggerMiddleware(application, header="X-Profile"))
+    profile = profile_in_background(0.6, triggered=True)
+    time.sleep(0.05)
+    client.get("/marked", headers={"X-Profile": "1"})
+    client.get("/unmarked")
+    profile["thread"].join()
+
+    assert ";marked (" in profile["stacks"]
+    assert "unmarked (" not in profile["stacks"]
+    assert not profiler.marked_frames
+
+
+def test_profile_endpoint_returns_text(admin_client):
+    response = admin_client.get("/admin/profile", params={"seconds": 0.05})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+def test_profile_endpoint_limits_and_locks(admin_client):
+    over = admin_client.get("/admin/profile", params={"seconds": 61})
+    assert over.status_code == 400
+    assert over.json() == {"detail": "seconds must be at most 60.0"}
+
+    with profiler._lock:  # pylint: disable=protected-access
+        busy = admin_client.get("/admin/profile", params={"seconds": 0.05})
+    assert busy.status_code == 409
+
+
+def test_profile_endpoint_needs_admin_permissions(admin_client):
+    admin_client.app.dependency_overrides[get_current_user] = lambda: {"sub": "auth0|bob"}
+
+    assert admin_client.get("/admin/profile", params={"seconds": 0.05}).status_code == 403
@@ -0,0 +1,81 @@
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.v1.endpoints import items, users
+from app.core.auth.auth0 import get_current_active_user
+from app.core.database import get_db
+from app.core.query_monitor import (
+    QueryBudgetExceeded, QueryMonitorMiddleware, instrument_engine, query_budget
+)
+
+
+def _two_queries(db: Session = Depends(get_db)):
+    db.execute(text("SELECT 1"))
+    db.execute(text("SELECT 2"))
+    return {}
+
+
+def _client(engine, strict: bool) -> TestClient:
+    instrument_engine(engine, slow_query_ms=60_000)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def get_test_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    application = FastAPI()
+    application.include_router(items.router, prefix="/items")
+    application.include_router(users.router, prefix="/users")
+    application.get("/over-budget")(query_budget(1)(_two_queries))
+    application.dependency_overrides[get_db] = get_test_db
+    application.dependency_overrides[get_current_active_user] = lambda: {
+        "sub": "auth0|alice", "email": "alice@example.com", "name": "Alice"
+    }
+    return TestClient(QueryMonitorMiddleware(application, strict=strict))
+
+
+def test_hot_routes_stay_within_their_budgets(engine):
+    client = _client(engine, strict=True)
+    assert client.get("/users/me").status_code == 200
+    ids = [
+        client.post("/items/", json={"name": f"item {n}", "price": 10.0}).json()["id"]
+        for n in range(10)
+    ]
+
+    # Each request is checked as it runs; ten items must not mean ten queries
+    listing = client.get("/items/")
+    assert len(listing.json()) == 10
+    revalidated = client.get("/items/", headers={"If-None-Match": listing.headers["ETag"]})
+    assert revalidated.status_code == 304
+    item = client.get(f"/items/{ids[0]}")
+    assert client.put(
+        f"/items/{ids[0]}", json={"price": 12.0}, headers={"If-Match": item.headers["ETag"]}
+    ).status_code == 200
+    assert len(client.get("/items/batch", params={"ids": ids}).json()["items"]) == 10
+    assert len(client.post("/items/batch", json={"ids": ids}).json()["items"]) == 10
+    assert client.get("/items/aggregates").json()["item_count"] == 10
+    assert client.delete(f"/items/{ids[1]}").status_code == 204
+    assert len(client.get("/users/me").json()["items"]) == 9
+    assert client.put("/users/me", json={"name": "Alice B"}).status_code == 200
+    assert client.get("/users/auth0|alice").status_code == 200
+
+
+def test_strict_mode_fails_the_query_over_budget(engine):
+    client = _client(engine, strict=True)
+    with pytest.raises(QueryBudgetExceeded, match="ran 2 queries, over its budget of 1"):
+        client.get("/over-budget")
+
+
+def test_lenient_mode_logs_the_route_over_budget(engine, caplog):
+    client = _client(engine, strict=False)
+    with caplog.at_level(logging.WARNING, logger="app.queries"):
+        assert client.get("/over-budget").status_code == 200
+    assert "GET /over-budget ran 2 queries, over its budget of 1" in caplog.text
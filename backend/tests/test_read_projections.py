@@ -0,0 +1,55 @@
+from sqlalchemy import Row
+
+from app.models.user import User
+from app.repositories.item import ItemRepository
+from app.repositories.user import UserRepository
+from app.schemas.item import ItemCreate
+
+items = ItemRepository()
+users = UserRepository()
+OWNER = "auth0|alice"
+
+
+def add_items(db):
+    db.add(User(id=OWNER, email="alice@example.com", company="acme"))
+    db.commit()
+    ids = [
+        items.create_with_owner(db, ItemCreate(name=name, price=10.0), OWNER).id
+        for name in ("Lamp", "Desk")
+    ]
+    db.expunge_all()
+    return ids
+
+
+def test_item_reads_return_rows_without_touching_the_session(db):
+    lamp_id, _ = add_items(db)
+
+    rows = items.read_by_owner(db, OWNER)
+    row = items.read_owned(db, lamp_id, OWNER)
+
+    assert all(isinstance(found, Row) for found in rows + [row])
+    assert row._fields == items.read_columns
+    assert len(db.identity_map) == 0
+
+
+def test_read_projection_narrows_to_the_requested_fields_and_id(db):
+    lamp_id, _ = add_items(db)
+
+    row = items.read(db, lamp_id, frozenset({"name"}))
+
+    assert row._fields == ("id", "name")
+    assert tuple(row) == (lamp_id, "Lamp")
+
+
+def test_user_read_is_shaped_like_the_schema(db):
+    add_items(db)
+
+    user = users.read_by_auth0_id(db, OWNER)
+    assert set(user) == set(users.read_columns) | {"items"}
+    assert sorted(item.name for item in user["items"]) == ["Desk", "Lamp"]
+
+    # Items are only loaded when asked for
+    assert users.read_by_auth0_id(db, OWNER, frozenset({"company"})) == {
+        "id": OWNER, "company": "acme"
+    }
+    assert len(db.identity_map) == 0
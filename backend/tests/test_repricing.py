@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.jobs import repricing
+from app.models.item import Item
+from app.models.repricing_job import RepricingJob
+from app.models.user import User
+from app.repositories.repricing_job import RepricingJobRepository
+from app.schemas.repricing import RepricingRule
+
+jobs = RepricingJobRepository()
+
+
+@pytest.fixture
+def owner(db):
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    db.add_all([
+        Item(id=f"item-{n}", name=f"Item {n}", price=10.0, owner_id="auth0|alice")
+        for n in range(5)
+    ])
+    db.commit()
+    return "auth0|alice"
+
+
+def create_job(db, owner_id, **columns):
+    job = jobs.create_for_owner(db, owner_id, RepricingRule(percent_change=10), total=5)
+    for name, value in columns.items():
+        setattr(job, name, value)
+    db.commit()
+    return job
+
+
+def prices(db):
+    db.expire_all()
+    return [item.price for item in db.query(Item).order_by(Item.id)]
+
+
+def test_claim_skips_jobs_with_a_live_lease(db, owner):
+    job = create_job(db, owner)
+    assert jobs.claim(db, job.id, 300)
+    assert not jobs.claim(db, job.id, 300)
+
+
+def test_claim_takes_over_a_stale_lease(db, owner):
+    job = create_job(db, owner, status="running", lease_until=datetime.utcnow() - timedelta(seconds=1))
+    assert jobs.is_resumable(job)
+    assert jobs.claim(db, job.id, 300)
+
+
+def test_claim_skips_completed_jobs(db, owner):
+    job = create_job(db, owner, status="completed")
+    assert not jobs.claim(db, job.id, 300)
+
+
+def test_run_resumes_after_the_last_finished_chunk(db, owner, monkeypatch):
+    job = create_job(db, owner)
+    reprice_chunk = repricing.item_repository.reprice_chunk
+    calls = []
+
+    def fail_on_second_chunk(*args, **kwargs):
+        calls.append(args[3])
+        if len(calls) == 2:
+            raise RuntimeError("worker lost")
+        return reprice_chunk(*args, **kwargs)
+
+    monkeypatch.setattr(repricing.item_repository, "reprice_chunk", fail_on_second_chunk)
+    with pytest.raises(RuntimeError):
+        repricing.run_repricing_job(db, job.id, chunk_size=2)
+    db.refresh(job)
+    assert (job.status, job.processed, job.last_item_id) == ("failed", 2, "item-1")
+    assert job.lease_until is None
+
+    monkeypatch.setattr(repricing.item_repository, "reprice_chunk", reprice_chunk)
+    repricing.run_repricing_job(db, job.id, chunk_size=2)
+    db.refresh(job)
+    assert (job.status, job.processed) == ("completed", 5)
+    # Every item was repriced exactly once
+    assert prices(db) == [pytest.approx(11.0)] * 5
+
+
+def test_run_leaves_a_job_held_by_a_live_run_alone(db, owner):
+    job = create_job(db, owner, status="running", lease_until=datetime.utcnow() + timedelta(minutes=5))
+    repricing.run_repricing_job(db, job.id, chunk_size=2)
+    db.refresh(job)
+    assert (job.status, job.processed) == ("running", 0)
+    assert prices(db) == [10.0] * 5
+
+
+def test_run_stops_when_another_run_takes_the_job_over(db, owner, monkeypatch):
+    job = create_job(db, owner)
+    reprice_chunk = repricing.item_repository.reprice_chunk
+
+    def take_over_then_reprice(session, *args, **kwargs):
+        # Another run claims the job after this one's lease ran out and
+        # records a chunk of its own
+        session.query(RepricingJob).filter(RepricingJob.id == job.id).update(
+            {"processed": RepricingJob.processed + 1}, synchronize_session=False
+        )
+        return reprice_chunk(session, *args, **kwargs)
+
+    monkeypatch.setattr(repricing.item_repository, "reprice_chunk", take_over_then_reprice)
+    repricing.run_repricing_job(db, job.id, chunk_size=2)
+    # This run's chunk was rolled back with the other run's progress
+    assert prices(db) == [10.0] * 5
+
+
+def test_job_endpoints_404_for_unknown_jobs(items_client):
+    assert items_client.get("/items/reprice/missing").status_code == 404
+    assert items_client.post("/items/reprice/missing/resume").status_code == 404
+
+
+def test_resume_accepts_a_running_job_with_a_stale_lease(db, owner, items_client, monkeypatch):
+    from app.api.v1.endpoints import items  # pylint: disable=import-outside-toplevel
+    started = []
+    monkeypatch.setattr(items, "run_repricing_job_in_background", started.append)
+    stale = create_job(db, owner, status="running", lease_until=datetime.utcnow() - timedelta(seconds=1))
+    live = create_job(db, owner, status="running", lease_until=datetime.utcnow() + timedelta(minutes=5))
+
+    assert items_client.post(f"/items/reprice/{stale.id}/resume").status_code == 202
+    assert items_client.post(f"/items/reprice/{live.id}/resume").status_code == 409
+    assert started == [stale.id]
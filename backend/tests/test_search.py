@@ -0,0 +1,56 @@
+import pytest
+
+from app.models.item import Item
+from app.models.user import User
+from app.repositories.item import ItemRepository
+from app.repositories.search import ItemSearchIndex
+from app.schemas.item import ItemCreate
+
+items = ItemRepository()
+
+
+@pytest.fixture
+def owner(db):
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    db.commit()
+    return "auth0|alice"
+
+
+def test_created_items_are_searchable(db, owner):
+    lamp = items.create_with_owner(db, ItemCreate(name="Desk lamp", price=20.0), owner)
+    items.create_with_owner(db, ItemCreate(name="Chair", description="Oak", price=50.0), owner)
+
+    assert lamp.id
+    assert [item_id for item_id, _ in items.search_index.search(db, owner, "lam")] == [lamp.id]
+
+
+def test_search_endpoint_finds_created_items(items_client, db, owner):
+    created = items_client.post("/items/", json={"name": "Desk lamp", "price": 20.0})
+    assert created.status_code == 201
+
+    found = items_client.get("/items/search", params={"q": "desk"}).json()
+    assert [item["id"] for item in found["items"]] == [created.json()["id"]]
+
+
+def test_upsert_rejects_items_without_an_id(db):
+    with pytest.raises(ValueError):
+        ItemSearchIndex().upsert(db, Item(name="Desk lamp", price=20.0))
+
+
+def test_search_pages_by_score_and_id(items_client, db, owner):
+    # Equal documents score alike, so paging has to break ties on id
+    created = [
+        items_client.post("/items/", json={"name": "Desk lamp", "price": 20.0}).json()["id"]
+        for _ in range(5)
+    ]
+    items_client.post("/items/", json={"name": "Chair", "price": 50.0})
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "lamp", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = items_client.get("/items/search", params=params).json()
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == sorted(created)
@@ -0,0 +1,65 @@
+import json
+import logging
+
+from fastapi.testclient import TestClient
+
+from app.core import timing
+from app.core.metrics import instrument_engine
+from app.core.timing import RequestTimings, ServerTimingMiddleware
+from app.models.user import User
+
+
+def test_header_value_sums_each_phase():
+    timings = RequestTimings()
+    timings.add("db", 0.002)
+    timings.add("db", 0.003)
+    timings.add("serialize", 0.0015)
+
+    assert timings.header_value(0.01) == (
+        'db;dur=5.00;desc="2x", serialize;dur=1.50;desc="1x", app;dur=10.00'
+    )
+
+
+def test_recording_outside_a_sampled_request_is_a_no_op():
+    timing.record("db", 1.0)
+    with timing.timed("serialize"):
+        pass
+
+
+def sampled_client(engine, items_client, header=True, sample_rate=1.0):
+    instrument_engine(engine)
+    return TestClient(ServerTimingMiddleware(
+        items_client.app, sample_rate=sample_rate, header=header
+    ))
+
+
+def test_sampled_requests_get_db_and_serialize_phases(db, engine, items_client):
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    db.commit()
+    client = sampled_client(engine, items_client)
+    client.post("/items/", json={"name": "Lamp", "price": 20.0})
+
+    header = client.get("/items/").headers["Server-Timing"]
+
+    phases = [entry.split(";")[0] for entry in header.split(", ")]
+    assert phases == ["db", "serialize", "app"]
+    assert 'db;dur=' in header and 'desc="2x"' in header
+
+
+def test_unsampled_requests_are_left_alone(engine, items_client):
+    client = sampled_client(engine, items_client, sample_rate=0.0)
+
+    assert "Server-Timing" not in client.get("/items/").headers
+
+
+def test_timings_are_logged_with_the_header_off(engine, items_client, caplog):
+    client = sampled_client(engine, items_client, header=False)
+
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        response = client.get("/items/aggregates")
+
+    assert "Server-Timing" not in response.headers
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["event"] == "request_timing"
+    assert (line["method"], line["route"], line["status"]) == ("GET", "/items/aggregates", 200)
+    assert line["phases"]["db"]["count"] == 1
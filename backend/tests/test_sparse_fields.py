@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.serialization import partial_model
+from app.models.user import User
+from app.schemas.item import Item
+from app.schemas.user import User as UserSchema
+
+
+@pytest.fixture
+def statements(engine):
+    """
+    SQL run on the test database while the test goes on
+    """
+    seen = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    return seen
+
+
+@pytest.fixture
+def lamp(db, items_client):
+    db.add(User(id="auth0|alice", email="alice@example.com"))
+    db.commit()
+    return items_client.post(
+        "/items/", json={"name": "Lamp", "description": "A long description", "price": 20.0}
+    ).json()
+
+
+def test_fields_narrow_the_select_and_the_response(items_client, lamp, statements):
+    response = items_client.get("/items/", params={"fields": "name, price"})
+
+    assert response.status_code == 200
+    assert response.json() == [{"name": "Lamp", "price": 20.0}]
+    listing = [sql for sql in statements if sql.lstrip().startswith("SELECT items.id")][-1]
+    assert "description" not in listing
+
+
+def test_unknown_fields_are_a_400(items_client, lamp):
+    response = items_client.get("/items/", params={"fields": "name,bogus,secret"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown fields: bogus, secret"}
+    assert items_client.get("/items/", params={"fields": " , "}).json() == {
+        "detail": "No fields requested"
+    }
+
+
+def test_partial_models_are_cached_per_field_set():
+    narrowed = partial_model(Item, frozenset({"id", "name"}))
+
+    assert narrowed is partial_model(Item, frozenset({"name", "id"}))
+    assert set(narrowed.model_fields) == {"id", "name"}
+    assert partial_model(Item, None) is Item
+    assert set(partial_model(UserSchema, frozenset({"email"})).model_fields) == {"email"}
@@ -0,0 +1,134 @@
+import errno
+from datetime import datetime
+
+import pytest
+
+from storage import InMemoryStore, StorePersistence, UniqueConstraintError
+
+
+def open_store(directory, **kwargs) -> InMemoryStore:
+    store = InMemoryStore(unique=("email",))
+    store.attach(StorePersistence(str(directory), "users", fsync_interval=0, **kwargs))
+    return store
+
+
+def test_unique_index_rejects_duplicates():
+    store = InMemoryStore(unique=("email",))
+    store.insert(1, {"email": "a@example.com"})
+    with pytest.raises(UniqueConstraintError):
+        store.insert(2, {"email": "a@example.com"})
+    assert store.find("email", "a@example.com") == {"email": "a@example.com"}
+
+
+def test_page_keeps_insertion_order_after_delete():
+    store = InMemoryStore()
+    for key in range(1, 6):
+        store.insert(key, {"n": key})
+    store.delete(2)
+    assert [row["n"] for row in store.page(skip=1, limit=2)] == [3, 4]
+
+
+def test_log_replay_restores_rows(tmp_path):
+    store = open_store(tmp_path)
+    store.insert(1, {"email": "a@example.com"})
+    store.insert(2, {"email": "b@example.com"})
+    store.update(1, {"email": "c@example.com"})
+    store.delete(2)
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert reopened.page() == [{"email": "c@example.com"}]
+    assert reopened.find("email", "c@example.com") is not None
+    reopened.close()
+
+
+def test_ids_deleted_after_snapshot_are_not_reused(tmp_path):
+    store = open_store(tmp_path)
+    for _ in range(5):
+        key = store.next_id()
+        store.insert(key, {"email": f"{key}@example.com"})
+    store.delete(4)
+    store.delete(5)
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert reopened.next_id() == 6
+    reopened.close()
+
+
+def test_replayed_and_snapshotted_rows_keep_their_types(tmp_path):
+    created_at = datetime(2024, 1, 2, 3, 4, 5)
+    store = open_store(tmp_path)
+    store.insert(1, {"email": "a@example.com", "created_at": created_at})
+    store._persistence.snapshot()
+    store.insert(2, {"email": "b@example.com", "created_at": created_at})
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert reopened.get(1)["created_at"] == created_at
+    assert reopened.get(2)["created_at"] == created_at
+    reopened.close()
+
+
+def test_snapshot_compacts_log_and_recovers(tmp_path):
+    store = open_store(tmp_path)
+    for key in range(1, 4):
+        store.insert(key, {"email": f"{key}@example.com"})
+    store._persistence.snapshot()
+    assert not (tmp_path / "users.log.old").exists()
+    store.delete(1)
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert [key for key in (1, 2, 3) if key in reopened] == [2, 3]
+    assert reopened.next_id() == 4
+    reopened.close()
+
+
+def test_torn_log_tail_is_ignored(tmp_path):
+    store = open_store(tmp_path)
+    store.insert(1, {"email": "a@example.com"})
+    store.insert(2, {"email": "b@example.com"})
+    store.close()
+    log_path = tmp_path / "users.log"
+    log_path.write_bytes(log_path.read_bytes()[:-3])
+
+    reopened = open_store(tmp_path)
+    assert 1 in reopened and 2 not in reopened
+    reopened.insert(3, {"email": "c@example.com"})
+    reopened.close()
+
+    # Writes made after recovering from the torn tail survive the next restart
+    again = open_store(tmp_path)
+    assert 1 in again and 3 in again
+    again.close()
+
+
+def test_failed_snapshots_keep_every_logged_write(tmp_path, monkeypatch):
+    store = open_store(tmp_path)
+
+    def out_of_space(state):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(store._persistence, "_write_snapshot", out_of_space)
+    for key in range(1, 4):
+        store.insert(key, {"email": f"{key}@x"})
+    with pytest.raises(OSError):
+        store._persistence.snapshot()
+    store.insert(4, {"email": "4@x"})
+    # The second rotation must not overwrite the log the first one left behind
+    with pytest.raises(OSError):
+        store._persistence.snapshot()
+    store.insert(5, {"email": "5@x"})
+    store.close()
+
+    reopened = open_store(tmp_path)
+    assert [row["email"] for row in reopened.page()] == ["1@x", "2@x", "3@x", "4@x", "5@x"]
+    reopened._persistence.snapshot()
+    reopened.close()
+
+    # A snapshot that succeeds afterwards replaces the whole backlog
+    assert not (tmp_path / "users.log.old").exists()
+    again = open_store(tmp_path)
+    assert len(again) == 5
+    again.close()